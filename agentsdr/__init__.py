@@ -55,6 +55,6 @@ def create_app(config_name=None):
     from agentsdr.auth.models import User
     @login_manager.user_loader
     def load_user(user_id):
-        return User.get_by_id(user_id)
+        return User.get_cached(user_id)
 
     return app
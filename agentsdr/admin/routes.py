@@ -1,8 +1,16 @@
 from flask import render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
+from werkzeug.exceptions import HTTPException
 from agentsdr.admin import admin_bp
 from agentsdr.core.supabase_client import get_service_supabase
 from agentsdr.core.rbac import require_super_admin
+from agentsdr.core.org_cache import get_org_by_id
+from agentsdr.core.cache import cache_stats
+from agentsdr.core.http import http_pool_stats
+from agentsdr.core.pagination import paginate_request
+from agentsdr.core.metrics import get_metric_totals, get_growth_series
+from agentsdr.core.queries import get_org_members_with_users, get_user_org_memberships, RECORD_LIST_COLUMNS, ORG_SUMMARY_COLUMNS, USER_COLUMNS
+from agentsdr.auth.models import User
 from datetime import datetime
 
 @admin_bp.route('/')
@@ -16,21 +24,21 @@ def dashboard():
     try:
         supabase = get_service_supabase()
 
-        # Get platform stats
-        orgs_count = supabase.table('organizations').select('id', count='exact').execute()
-        users_count = supabase.table('users').select('id', count='exact').execute()
-        records_count = supabase.table('records').select('id', count='exact').execute()
+        # Get platform stats from the trigger-maintained totals
+        totals = get_metric_totals()
+        growth = get_growth_series(['users', 'organizations', 'records'], days=30)
 
         # Get recent organizations
-        recent_orgs = supabase.table('organizations').select('*').order('created_at', desc=True).limit(5).execute()
+        recent_orgs = supabase.table('organizations').select(ORG_SUMMARY_COLUMNS).order('created_at', desc=True).limit(5).execute()
 
         # Get recent users
-        recent_users = supabase.table('users').select('*').order('created_at', desc=True).limit(5).execute()
+        recent_users = supabase.table('users').select(USER_COLUMNS).order('created_at', desc=True).limit(5).execute()
 
         return render_template('admin/dashboard.html',
-                             orgs_count=orgs_count.count if orgs_count.count else 0,
-                             users_count=users_count.count if users_count.count else 0,
-                             records_count=records_count.count if records_count.count else 0,
+                             orgs_count=totals.get('organizations', 0),
+                             users_count=totals.get('users', 0),
+                             records_count=totals.get('records', 0),
+                             growth=growth,
                              recent_orgs=recent_orgs.data,
                              recent_users=recent_users.data)
 
@@ -44,18 +52,14 @@ def list_organizations():
     try:
         supabase = get_service_supabase()
 
-        # Get all organizations with member counts
-        orgs_response = supabase.table('organizations').select('*').order('created_at', desc=True).execute()
-
-        organizations = []
-        for org in orgs_response.data:
-            # Get member count for each org
-            members_count = supabase.table('organization_members').select('id', count='exact').eq('org_id', org['id']).execute()
-            org['member_count'] = members_count.count if members_count.count else 0
-            organizations.append(org)
+        # Organizations with member counts, one page per query
+        page = paginate_request(supabase.table('admin_organization_stats').select('*'))
 
-        return render_template('admin/organizations.html', organizations=organizations)
+        return render_template('admin/organizations.html', organizations=page.items, page=page)
 
+    except HTTPException:
+        # Invalid pagination cursor (400)
+        raise
     except Exception as e:
         flash('Error loading organizations.', 'error')
         return redirect(url_for('admin.dashboard'))
@@ -67,33 +71,19 @@ def view_organization(org_id):
         supabase = get_service_supabase()
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('id', org_id).execute()
-        if not org_response.data:
+        organization = get_org_by_id(org_id)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('admin.list_organizations'))
 
-        organization = org_response.data[0]
-
-        # Get members
-        members_response = supabase.table('organization_members').select('user_id, role, joined_at').eq('org_id', org_id).execute()
-        members = []
-        for member in members_response.data:
-            user_response = supabase.table('users').select('email, display_name').eq('id', member['user_id']).execute()
-            if user_response.data:
-                user_data = user_response.data[0]
-                members.append({
-                    'user_id': member['user_id'],
-                    'email': user_data['email'],
-                    'display_name': user_data.get('display_name'),
-                    'role': member['role'],
-                    'joined_at': member['joined_at']
-                })
+        # Get members with their user profiles in one query
+        members = get_org_members_with_users(org_id)
 
         # Get records count
         records_count = supabase.table('records').select('id', count='exact').eq('org_id', org_id).execute()
 
         # Get recent records
-        recent_records = supabase.table('records').select('*').eq('org_id', org_id).order('created_at', desc=True).limit(10).execute()
+        recent_records = supabase.table('records').select(RECORD_LIST_COLUMNS).eq('org_id', org_id).order('created_at', desc=True).limit(10).execute()
 
         return render_template('admin/organization_detail.html',
                              organization=organization,
@@ -111,18 +101,14 @@ def list_users():
     try:
         supabase = get_service_supabase()
 
-        # Get all users with organization counts
-        users_response = supabase.table('users').select('*').order('created_at', desc=True).execute()
+        # Users with organization counts, one page per query
+        page = paginate_request(supabase.table('admin_user_stats').select('*'))
 
-        users = []
-        for user in users_response.data:
-            # Get organization count for each user
-            orgs_count = supabase.table('organization_members').select('id', count='exact').eq('user_id', user['id']).execute()
-            user['org_count'] = orgs_count.count if orgs_count.count else 0
-            users.append(user)
-
-        return render_template('admin/users.html', users=users)
+        return render_template('admin/users.html', users=page.items, page=page)
 
+    except HTTPException:
+        # Invalid pagination cursor (400)
+        raise
     except Exception as e:
         flash('Error loading users.', 'error')
         return redirect(url_for('admin.dashboard'))
@@ -134,7 +120,7 @@ def view_user(user_id):
         supabase = get_service_supabase()
 
         # Get user
-        user_response = supabase.table('users').select('*').eq('id', user_id).execute()
+        user_response = supabase.table('users').select(USER_COLUMNS).eq('id', user_id).execute()
         if not user_response.data:
             flash('User not found.', 'error')
             return redirect(url_for('admin.list_users'))
@@ -142,23 +128,13 @@ def view_user(user_id):
         user = user_response.data[0]
 
         # Get user's organizations
-        orgs_response = supabase.table('organization_members').select('org_id, role, joined_at').eq('user_id', user_id).execute()
-        organizations = []
-        for org_member in orgs_response.data:
-            org_response = supabase.table('organizations').select('*').eq('id', org_member['org_id']).execute()
-            if org_response.data:
-                org_data = org_response.data[0]
-                organizations.append({
-                    'org': org_data,
-                    'role': org_member['role'],
-                    'joined_at': org_member['joined_at']
-                })
+        organizations = get_user_org_memberships(user_id, org_columns=ORG_SUMMARY_COLUMNS)
 
         # Get user's records count
         records_count = supabase.table('records').select('id', count='exact').eq('created_by', user_id).execute()
 
         # Get recent records
-        recent_records = supabase.table('records').select('*').eq('created_by', user_id).order('created_at', desc=True).limit(10).execute()
+        recent_records = supabase.table('records').select(RECORD_LIST_COLUMNS).eq('created_by', user_id).order('created_at', desc=True).limit(10).execute()
 
         return render_template('admin/user_detail.html',
                              user=user,
@@ -186,6 +162,7 @@ def toggle_super_admin(user_id):
 
         # Update user
         supabase.table('users').update({'is_super_admin': new_status}).eq('id', user_id).execute()
+        User.invalidate_cache(user_id)
 
         status_text = 'Super Admin' if new_status else 'Regular User'
         flash(f'User status updated to {status_text}.', 'success')
@@ -193,3 +170,15 @@ def toggle_super_admin(user_id):
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/metrics/cache')
+@require_super_admin
+def cache_metrics():
+    """Hit/miss counters for the caches in this worker process"""
+    return jsonify({'caches': cache_stats()})
+
+@admin_bp.route('/metrics/http')
+@require_super_admin
+def http_metrics():
+    """Outbound connection pool utilization in this worker process"""
+    return jsonify({'pools': http_pool_stats()})
@@ -1,9 +1,14 @@
+from flask import current_app
 from flask_login import UserMixin
+from agentsdr.core.cache import get_cache
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
 from agentsdr.core.models import User as UserModel
 from typing import Optional
 import uuid
 
+def _user_cache():
+    return get_cache('users', ttl=current_app.config.get('USER_CACHE_TTL', 60))
+
 class User(UserMixin):
     def __init__(self, id: str, email: str, display_name: str = None, is_super_admin: bool = False):
         self.id = id
@@ -29,6 +34,33 @@ class User(UserMixin):
         except Exception as e:
             print(f"Error getting user by ID: {e}")
         return None
+
+    @staticmethod
+    def get_cached(user_id: str) -> Optional['User']:
+        """Get user by ID for the session loader, cached for USER_CACHE_TTL seconds"""
+        cache = _user_cache()
+        user_data = cache.get(user_id)
+        if user_data is not None:
+            return User(**user_data)
+
+        user = User.get_by_id(user_id)
+        if user:
+            cache.set(user_id, user.to_cache())
+        return user
+
+    @staticmethod
+    def invalidate_cache(user_id: str):
+        """Drop a cached user after their row changes (role or profile updates)"""
+        _user_cache().delete(user_id)
+
+    def to_cache(self) -> dict:
+        """Compact representation stored in the user cache"""
+        return {
+            'id': self.id,
+            'email': self.email,
+            'display_name': self.display_name,
+            'is_super_admin': self.is_super_admin
+        }
     
     @staticmethod
     def get_by_email(email: str) -> Optional['User']:
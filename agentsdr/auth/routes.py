@@ -6,6 +6,8 @@ from agentsdr.auth.models import User
 from agentsdr.core.supabase_client import get_supabase, supabase
 from agentsdr.core.email import get_email_service
 from agentsdr.core.rbac import require_super_admin
+from agentsdr.core.org_cache import get_org_by_id
+from agentsdr.core.queries import invalidate_org_overview
 from datetime import datetime, timedelta
 import uuid
 import secrets
@@ -139,13 +141,11 @@ def accept_invitation():
             return redirect(url_for('auth.login'))
         
         # Get organization details
-        org_response = supabase_client.table('organizations').select('*').eq('id', invitation['org_id']).execute()
-        if not org_response.data:
+        organization = get_org_by_id(invitation['org_id'])
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('auth.login'))
         
-        organization = org_response.data[0]
-        
         if request.method == 'POST':
             # Handle invitation acceptance
             if current_user.is_authenticated:
@@ -225,6 +225,7 @@ def _accept_invitation_for_user(user, invitation, organization):
         supabase_client.table('invitations').update({
             'accepted_at': datetime.utcnow().isoformat()
         }).eq('id', invitation['id']).execute()
+        invalidate_org_overview(invitation['org_id'])
         
         # Send welcome email
         get_email_service().send_welcome_email(user.email, organization['name'])
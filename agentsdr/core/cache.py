@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from flask import current_app
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL (seconds)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """Remove a key if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size, for monitoring"""
+        with self._lock:
+            return {'backend': 'memory', 'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize, 'ttl': self.ttl}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class RedisCache:
+    """Cache shared by every worker through Redis; values must be JSON serializable"""
+
+    def __init__(self, url: str, namespace: str, ttl: float = 300):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self._redis = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"agentsdr:{self.namespace}:{key}"
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raw = self._redis.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._redis.set(self._key(key), json.dumps(value, default=str), ex=int(self.ttl if ttl is None else ttl))
+
+    def delete(self, key: Hashable):
+        self._redis.delete(self._key(key))
+
+    def clear(self):
+        for key in self._redis.scan_iter(f"agentsdr:{self.namespace}:*"):
+            self._redis.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'hits': self.hits, 'misses': self.misses, 'ttl': self.ttl}
+
+
+_named_caches = {}
+_named_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl: float, maxsize: int = 1024):
+    """Get a named cache on the backend selected by CACHE_BACKEND ('memory' or 'redis').
+
+    Named caches are created once per process and reported by cache_stats.
+    """
+    with _named_caches_lock:
+        cache = _named_caches.get(name)
+        if cache is None:
+            if current_app.config.get('CACHE_BACKEND', 'memory') == 'redis':
+                cache = RedisCache(current_app.config['REDIS_URL'], name, ttl=ttl)
+            else:
+                cache = TTLCache(maxsize=maxsize, ttl=ttl)
+            _named_caches[name] = cache
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every named cache created in this process"""
+    with _named_caches_lock:
+        caches = dict(_named_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
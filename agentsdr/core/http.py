@@ -0,0 +1,116 @@
+"""
+Shared outbound HTTP connection pools (Supabase, Google OAuth and Gmail), configured from config.py
+"""
+import threading
+from typing import Any, Dict, Optional
+import httpx
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
+from google_auth_httplib2 import AuthorizedHttp
+from flask import current_app
+
+_transport = None
+_session = None
+_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional 'h2' package; fall back to HTTP/1.1 without it"""
+    if not current_app.config.get('HTTP2_ENABLED', True):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_timeout() -> httpx.Timeout:
+    """Default timeout for pooled httpx clients"""
+    return httpx.Timeout(current_app.config.get('HTTP_TIMEOUT', 30),
+                         connect=current_app.config.get('HTTP_CONNECT_TIMEOUT', 5))
+
+
+def get_http_transport() -> httpx.HTTPTransport:
+    """Get the process-wide httpx transport; clients built on it share one connection pool"""
+    global _transport
+    with _lock:
+        if _transport is None:
+            config = current_app.config
+            _transport = httpx.HTTPTransport(
+                http2=_http2_enabled(),
+                limits=httpx.Limits(
+                    max_connections=config.get('HTTP_POOL_CONNECTIONS', 20),
+                    max_keepalive_connections=config.get('HTTP_POOL_KEEPALIVE', 10),
+                    keepalive_expiry=config.get('HTTP_KEEPALIVE_EXPIRY', 30)
+                )
+            )
+        return _transport
+
+
+def get_requests_session() -> requests.Session:
+    """Get the process-wide requests session (used for Google OAuth token calls)"""
+    global _session
+    with _lock:
+        if _session is None:
+            size = current_app.config.get('HTTP_POOL_CONNECTIONS', 20)
+            adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            _session = requests.Session()
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def get_google_http(credentials) -> AuthorizedHttp:
+    """Authorized httplib2 client for googleapiclient with the configured timeout.
+
+    httplib2 is not thread-safe, so each Gmail service gets its own instance;
+    it keeps its connections alive for as long as the service is reused.
+    """
+    return AuthorizedHttp(credentials, http=httplib2.Http(timeout=current_app.config.get('HTTP_TIMEOUT', 30)))
+
+
+def _total(items, value) -> Optional[int]:
+    """Sum ``value(item)``, or None if an item lacks the attribute it reads"""
+    try:
+        return sum(value(item) for item in items)
+    except AttributeError:
+        return None
+
+
+def _count(items, predicate) -> Optional[int]:
+    """Number of items matching ``predicate``, or None if unknown"""
+    if items is None:
+        return None
+    return _total(items, lambda item: 1 if predicate(item) else 0)
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    """Connection pool utilization for the shared transports in this process.
+
+    Reads private httpcore/urllib3 attributes, so every one is optional: a
+    value the installed version does not expose is reported as None.
+    """
+    stats = {}
+    if _transport is not None:
+        pool = getattr(_transport, '_pool', None)
+        connections = getattr(pool, 'connections', None)
+        stats['httpx'] = {
+            'max_connections': getattr(pool, '_max_connections', None),
+            'max_keepalive_connections': getattr(pool, '_max_keepalive_connections', None),
+            'connections': len(connections) if connections is not None else None,
+            'idle': _count(connections, lambda connection: connection.is_idle()),
+            'http2': getattr(pool, '_http2', None)
+        }
+    if _session is not None:
+        adapter = _session.get_adapter('https://')
+        pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+        pools = [pools[key] for key in pools.keys()] if pools is not None else []
+        stats['requests'] = {
+            'hosts': len(pools),
+            'connections_created': _total(pools, lambda pool: pool.num_connections),
+            'requests': _total(pools, lambda pool: pool.num_requests),
+            'free_slots': _total(pools, lambda pool: pool.pool.qsize() if pool.pool is not None else 0)
+        }
+    return stats
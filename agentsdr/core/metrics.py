@@ -0,0 +1,48 @@
+"""
+Read side of the trigger-maintained platform_metrics tables (see supabase/schema.sql)
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable
+from agentsdr.core.supabase_client import get_service_supabase
+
+# org_id used for platform-wide totals
+PLATFORM_SCOPE = '00000000-0000-0000-0000-000000000000'
+
+
+def get_metric_totals(org_id: str = PLATFORM_SCOPE) -> Dict[str, int]:
+    """Get running totals per table, platform-wide or for one organization"""
+    supabase = get_service_supabase()
+    response = supabase.table('platform_metrics').select('metric, total').eq('org_id', org_id).execute()
+    totals = {}
+    for row in response.data or []:
+        # Counters are sharded across several rows
+        totals[row['metric']] = totals.get(row['metric'], 0) + row['total']
+    return totals
+
+
+def get_growth_series(metrics: Iterable[str], days: int = 30) -> Dict[str, List[Dict[str, Any]]]:
+    """Get daily created/deleted counts for the last ``days`` days, oldest first.
+
+    Days are UTC dates, as written by the database trigger. Days without
+    activity are filled with zeros so every series has one point per day.
+    """
+    metrics = list(metrics)
+    start = datetime.utcnow().date() - timedelta(days=days - 1)
+    supabase = get_service_supabase()
+    response = supabase.table('platform_metrics_daily').select('metric, day, created, deleted') \
+        .in_('metric', metrics).gte('day', start.isoformat()).execute()
+
+    buckets = {}
+    for row in response.data or []:
+        bucket = buckets.setdefault((row['metric'], row['day']), {'created': 0, 'deleted': 0})
+        bucket['created'] += row['created']
+        bucket['deleted'] += row['deleted']
+    series = {}
+    for metric in metrics:
+        points = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).isoformat()
+            row = buckets.get((metric, day), {})
+            points.append({'day': day, 'created': row.get('created', 0), 'deleted': row.get('deleted', 0)})
+        series[metric] = points
+    return series
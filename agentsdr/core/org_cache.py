@@ -0,0 +1,54 @@
+from typing import Optional
+from flask import current_app
+from agentsdr.core.cache import get_cache
+from agentsdr.core.queries import ORG_COLUMNS
+from agentsdr.core.supabase_client import get_service_supabase
+
+
+def _org_cache():
+    return get_cache('organizations',
+                     ttl=current_app.config.get('ORG_CACHE_TTL', 300),
+                     maxsize=current_app.config.get('ORG_CACHE_MAXSIZE', 1024))
+
+
+def _remember(organization: dict):
+    cache = _org_cache()
+    cache.set(f"slug:{organization['slug']}", organization)
+    cache.set(f"id:{organization['id']}", organization)
+
+
+def get_org_by_slug(org_slug: str) -> Optional[dict]:
+    """Get an organization row by slug, served from the org cache when possible"""
+    organization = _org_cache().get(f"slug:{org_slug}")
+    if organization is not None:
+        return organization
+
+    supabase = get_service_supabase()
+    response = supabase.table('organizations').select(ORG_COLUMNS).eq('slug', org_slug).limit(1).execute()
+    if not response.data:
+        return None
+    organization = response.data[0]
+    _remember(organization)
+    return organization
+
+
+def get_org_by_id(org_id: str) -> Optional[dict]:
+    """Get an organization row by id, served from the org cache when possible"""
+    organization = _org_cache().get(f"id:{org_id}")
+    if organization is not None:
+        return organization
+
+    supabase = get_service_supabase()
+    response = supabase.table('organizations').select(ORG_COLUMNS).eq('id', org_id).limit(1).execute()
+    if not response.data:
+        return None
+    organization = response.data[0]
+    _remember(organization)
+    return organization
+
+
+def invalidate_org(organization: dict):
+    """Drop an organization from the cache after it is edited or deleted"""
+    cache = _org_cache()
+    cache.delete(f"slug:{organization['slug']}")
+    cache.delete(f"id:{organization['id']}")
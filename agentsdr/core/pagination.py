@@ -0,0 +1,94 @@
+"""
+Keyset pagination over (created_at, id), newest first
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from flask import abort, current_app, request
+
+
+@dataclass
+class Page:
+    """One page of rows plus the cursor for the next one"""
+    items: List[Dict[str, Any]]
+    cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self) -> bool:
+        return self.cursor is None
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Encode the (created_at, id) position of a row as an opaque URL-safe cursor"""
+    raw = json.dumps([row['created_at'], row['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed.
+
+    The values end up quoted inside a PostgREST filter, so created_at must be
+    an ISO timestamp and id a UUID; both are returned in canonical form.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(str(created_at)).isoformat()
+        row_id = str(uuid.UUID(str(row_id)))
+    except Exception:
+        raise ValueError('Invalid pagination cursor')
+    return created_at, row_id
+
+
+def paginate(query, cursor: Optional[str] = None, limit: int = 50) -> Page:
+    """Run a PostgREST select one page at a time, ordered by created_at then id (descending).
+
+    ``query`` is an unexecuted select builder with any filters already applied.
+    An invalid cursor falls back to the first page.
+    """
+    if cursor:
+        try:
+            created_at, row_id = decode_cursor(cursor)
+        except ValueError:
+            cursor = None
+        else:
+            # postgrest-py 0.13 has no or_(), so add the logic tree parameter directly
+            query.params = query.params.add(
+                'or', f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}"))'
+            )
+
+    # Chained order() calls would send two order parameters; PostgREST wants one list
+    query.params = query.params.add('order', 'created_at.desc,id.desc')
+    # Fetch one extra row to know whether there is a next page
+    response = query.limit(limit + 1).execute()
+    rows = response.data or []
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return Page(items=items, cursor=cursor, next_cursor=next_cursor)
+
+
+def paginate_request(query) -> Page:
+    """Paginate using the ``cursor`` and ``limit`` request arguments.
+
+    ``limit`` defaults to PAGE_SIZE and is capped at MAX_PAGE_SIZE; a
+    malformed cursor aborts with 400.
+    """
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            abort(400, description="Invalid pagination cursor")
+    default_limit = current_app.config.get('PAGE_SIZE', 50)
+    max_limit = current_app.config.get('MAX_PAGE_SIZE', 200)
+    limit = request.args.get('limit', default_limit, type=int)
+    limit = min(max(limit, 1), max_limit)
+    return paginate(query, cursor=cursor, limit=limit)
@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional
+from flask import current_app
+from agentsdr.core.cache import get_cache
+from agentsdr.core.supabase_client import get_service_supabase
+
+# Column sets per view, so list pages only fetch the fields they render.
+# Full record content is only loaded by the record detail and edit views.
+RECORD_LIST_COLUMNS = 'id, org_id, title, created_by, created_at, updated_at'
+RECORD_DETAIL_COLUMNS = 'id, org_id, title, content, created_by, created_at, updated_at'
+ORG_COLUMNS = 'id, name, slug, owner_user_id, created_at, updated_at'
+ORG_SUMMARY_COLUMNS = 'id, name, slug'
+USER_COLUMNS = 'id, email, display_name, is_super_admin, created_at, updated_at'
+INVITATION_COLUMNS = 'id, org_id, email, role, token, expires_at, accepted_at, invited_by, created_at'
+
+
+def get_org_members_with_users(org_id: str) -> List[Dict[str, Any]]:
+    """Get an organization's members joined with their user profiles in one query.
+
+    Uses a PostgREST embedded select over the organization_members.user_id
+    foreign key. Callers must have checked access to the organization.
+    """
+    supabase = get_service_supabase()
+    response = supabase.table('organization_members') \
+        .select('user_id, role, joined_at, users(email, display_name)') \
+        .eq('org_id', org_id).execute()
+
+    members = []
+    for member in response.data or []:
+        user_data = member.get('users')
+        if not user_data:
+            continue
+        members.append({
+            'user_id': member['user_id'],
+            'email': user_data['email'],
+            'display_name': user_data.get('display_name'),
+            'role': member['role'],
+            'joined_at': member['joined_at']
+        })
+    return members
+
+
+def get_user_org_memberships(user_id: str, role: Optional[str] = None,
+                             org_columns: str = ORG_COLUMNS) -> List[Dict[str, Any]]:
+    """Get the organizations a user belongs to, with their role, in one query.
+
+    Returns ``[{'org': {...}, 'role': 'admin' | 'member', 'joined_at': ...}]``, optionally
+    restricted to one role. ``org_columns`` selects the organization columns.
+    """
+    supabase = get_service_supabase()
+    query = supabase.table('organization_members') \
+        .select(f'role, joined_at, organizations({org_columns})') \
+        .eq('user_id', user_id)
+    if role:
+        query = query.eq('role', role)
+    response = query.execute()
+
+    return [{'org': membership['organizations'], 'role': membership['role'],
+             'joined_at': membership.get('joined_at')}
+            for membership in response.data or []
+            if membership.get('organizations')]
+
+
+def _org_overview_cache():
+    return get_cache('org_overview', ttl=current_app.config.get('ORG_OVERVIEW_TTL', 30))
+
+
+def get_org_overview(org_id: str) -> Dict[str, Any]:
+    """Get an organization's counters and 10 most recent records via the org_overview RPC.
+
+    Results are cached for ORG_OVERVIEW_TTL seconds. Returns members_count,
+    records_count, invites_count, agents_count and recent_records.
+    """
+    cache = _org_overview_cache()
+    overview = cache.get(org_id)
+    if overview is not None:
+        return overview
+
+    supabase = get_service_supabase()
+    response = supabase.rpc('org_overview', {'p_org_id': org_id, 'p_recent_limit': 10}).execute()
+    overview = response.data or {}
+    cache.set(org_id, overview)
+    return overview
+
+
+def invalidate_org_overview(org_id: str):
+    """Drop the cached overview after an org's records or members change"""
+    _org_overview_cache().delete(org_id)
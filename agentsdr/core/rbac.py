@@ -1,8 +1,9 @@
 from functools import wraps
-from flask import abort, current_app, session, redirect, url_for, flash
+from flask import abort, current_app, session, redirect, url_for, flash, g
 from flask_login import current_user, login_required
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
 from agentsdr.core.models import UserRole, OrganizationMemberRole
+from agentsdr.core.org_cache import get_org_by_slug
 from typing import Optional
 
 def require_super_admin(f):
@@ -18,6 +19,24 @@ def require_super_admin(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def _resolve_org_access(org_slug: str):
+    """Load the organization and the current user's role once per request.
+
+    The results are kept on ``flask.g`` as ``organization`` (None if the slug
+    does not exist) and ``org_role`` (None for non-members) so decorated views
+    can use them through get_current_org / get_current_org_role.
+    """
+    g.org_slug = org_slug
+    g.organization = get_org_by_slug(org_slug)
+    g.org_role = None
+
+    # Super admins bypass membership, so skip the lookup for them
+    if g.organization and not current_user.is_super_admin:
+        supabase = get_service_supabase()
+        response = supabase.table('organization_members').select('role').eq('org_id', g.organization['id']).eq('user_id', current_user.id).limit(1).execute()
+        if response.data:
+            g.org_role = OrganizationMemberRole(response.data[0]['role'])
+
 def require_org_admin(org_slug_param='org_slug'):
     """Decorator to require organization admin access"""
     def decorator(f):
@@ -26,24 +45,24 @@ def require_org_admin(org_slug_param='org_slug'):
             if not current_user.is_authenticated:
                 return redirect(url_for('auth.login'))
             
-            # Super admins bypass org checks
-            if current_user.is_super_admin:
-                return f(*args, **kwargs)
-            
             org_slug = kwargs.get(org_slug_param)
             if not org_slug:
+                # Super admins bypass org checks
+                if current_user.is_super_admin:
+                    return f(*args, **kwargs)
                 abort(400, description="Organization slug required")
 
-            # Resolve slug -> org_id first
-            supabase = get_service_supabase()
-            org_resp = supabase.table('organizations').select('id').eq('slug', org_slug).limit(1).execute()
-            if not org_resp.data:
+            _resolve_org_access(org_slug)
+
+            # Super admins bypass org checks
+            if current_user.is_super_admin:
+                return f(*args, **kwargs)
+
+            if not g.organization:
                 abort(404, description="Organization not found")
-            org_id = org_resp.data[0]['id']
 
             # Check if user is admin of the organization
-            response = supabase.table('organization_members').select('id').eq('org_id', org_id).eq('user_id', current_user.id).eq('role', 'admin').limit(1).execute()
-            if not response.data:
+            if g.org_role != OrganizationMemberRole.ADMIN:
                 abort(403, description="Organization admin access required")
 
             return f(*args, **kwargs)
@@ -58,31 +77,40 @@ def require_org_member(org_slug_param='org_slug'):
             if not current_user.is_authenticated:
                 return redirect(url_for('auth.login'))
             
-            # Super admins bypass org checks
-            if current_user.is_super_admin:
-                return f(*args, **kwargs)
-            
             org_slug = kwargs.get(org_slug_param)
             if not org_slug:
+                # Super admins bypass org checks
+                if current_user.is_super_admin:
+                    return f(*args, **kwargs)
                 abort(400, description="Organization slug required")
 
-            # Resolve slug -> org_id
-            supabase = get_service_supabase()
-            org_resp = supabase.table('organizations').select('id').eq('slug', org_slug).limit(1).execute()
-            if not org_resp.data:
+            _resolve_org_access(org_slug)
+
+            # Super admins bypass org checks
+            if current_user.is_super_admin:
+                return f(*args, **kwargs)
+
+            if not g.organization:
                 abort(404, description="Organization not found")
-            org_id = org_resp.data[0]['id']
 
             # Check if user is a member of the organization
-            response = supabase.table('organization_members').select('id').eq('org_id', org_id).eq('user_id', current_user.id).limit(1).execute()
-
-            if not response.data:
+            if g.org_role is None:
                 abort(403, description="Organization membership required")
 
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+def get_current_org(org_slug: str) -> Optional[dict]:
+    """Get the organization row for org_slug, reusing the one loaded by the RBAC decorators"""
+    if g.get('org_slug') == org_slug:
+        return g.organization
+    return get_org_by_slug(org_slug)
+
+def get_current_org_role() -> Optional[OrganizationMemberRole]:
+    """Get the current user's role in the organization resolved for this request"""
+    return g.get('org_role')
+
 def get_user_org_role(user_id: str, org_id: str) -> Optional[OrganizationMemberRole]:
     """Get the user's role in a specific organization"""
     supabase = get_supabase()
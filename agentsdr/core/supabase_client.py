@@ -1,59 +1,173 @@
-from supabase import create_client, Client
-from flask import current_app, session
+from supabase import create_client
+from supabase.lib.client_options import ClientOptions
+from flask import current_app, session, g, has_request_context
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient
+from agentsdr.core.http import get_http_transport, get_http_timeout
+import base64
+import httpx
+import json
+import threading
+import time
 import os
 from typing import Optional, Dict, Any
 
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose HTTP session shares a connection pool with other clients"""
+
+    def __init__(self, base_url: str, headers: Dict[str, str], transport: httpx.HTTPTransport,
+                 timeout: httpx.Timeout):
+        self._transport = transport
+        super().__init__(base_url, headers=headers, timeout=timeout)
+
+    def create_session(self, base_url, headers, timeout) -> SyncClient:
+        return SyncClient(base_url=base_url, headers=headers, timeout=timeout, transport=self._transport)
+
+
+class RequestClient:
+    """Supabase handle bound to one access token.
+
+    Each request gets its own handle, so concurrent requests in a threaded
+    worker never share auth state. Only ``table``/``from_``/``rpc`` and
+    ``auth`` are supported, which is all the app uses.
+    """
+
+    def __init__(self, manager: 'SupabaseManager', access_token: Optional[str] = None,
+                 api_key: Optional[str] = None):
+        self._manager = manager
+        self.access_token = access_token
+        self.api_key = api_key
+        self._postgrest: Optional[PooledPostgrestClient] = None
+        self._auth = None
+
+    @property
+    def postgrest(self) -> PooledPostgrestClient:
+        if self._postgrest is None:
+            self._postgrest = self._manager.create_postgrest(self.access_token, self.api_key)
+        return self._postgrest
+
+    @property
+    def auth(self):
+        # A fresh GoTrue client per handle: sign-in state is never shared between requests
+        if self._auth is None:
+            self._auth = self._manager.create_auth_client()
+        return self._auth
+
+    def table(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: Dict[Any, Any]):
+        return self.postgrest.rpc(fn, params)
+
+
+def _token_expires_at(access_token: str) -> Optional[int]:
+    """Read the exp claim of a JWT without verifying it"""
+    try:
+        payload = access_token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+    except Exception:
+        return None
+
+
 class SupabaseManager:
     def __init__(self):
-        self._client: Optional[Client] = None
-        self._service_client: Optional[Client] = None
-    
-    def get_client(self) -> Client:
+        self._service_client: Optional[RequestClient] = None
+        self._transport: Optional[httpx.BaseTransport] = None
+        self._lock = threading.Lock()
+
+    def _get_transport(self) -> httpx.BaseTransport:
+        """Connection pool shared by every PostgREST client (see core.http)"""
+        return self._transport or get_http_transport()
+
+    def create_postgrest(self, access_token: Optional[str] = None,
+                         api_key: Optional[str] = None) -> PooledPostgrestClient:
+        """PostgREST client authenticated as the given token, or anonymously"""
+        api_key = api_key or current_app.config['SUPABASE_ANON_KEY']
+        headers = {
+            'apiKey': api_key,
+            'Authorization': f"Bearer {access_token or api_key}"
+        }
+        return PooledPostgrestClient(f"{current_app.config['SUPABASE_URL']}/rest/v1", headers,
+                                     self._get_transport(), get_http_timeout())
+
+    def create_auth_client(self):
+        """Standalone GoTrue client with in-memory, per-instance session storage"""
+        client = create_client(
+            current_app.config['SUPABASE_URL'],
+            current_app.config['SUPABASE_ANON_KEY'],
+            options=ClientOptions(auto_refresh_token=False, persist_session=False)
+        )
+        return client.auth
+
+    def get_client(self) -> RequestClient:
         """Get the Supabase client with user authentication"""
-        if not self._client:
-            self._client = create_client(
-                current_app.config['SUPABASE_URL'],
-                current_app.config['SUPABASE_ANON_KEY']
-            )
-        
-        # Set auth token if available in session
-        if 'supabase_token' in session:
-            self._client.auth.set_session(session['supabase_token'], session.get('supabase_refresh_token'))
-        
-        return self._client
-    
-    def get_service_client(self) -> Client:
-        """Get the Supabase client with service role key (admin access)"""
-        if not self._service_client:
-            self._service_client = create_client(
-                current_app.config['SUPABASE_URL'],
-                current_app.config['SUPABASE_SERVICE_ROLE_KEY']
-            )
-        return self._service_client
-    
+        if not has_request_context():
+            return RequestClient(self)
+
+        access_token = self._current_access_token()
+        client = g.get('supabase_client')
+        if client is None or client.access_token != access_token:
+            client = RequestClient(self, access_token)
+            g.supabase_client = client
+        return client
+
+    def _current_access_token(self) -> Optional[str]:
+        """The session's access token, refreshed first if it has expired"""
+        access_token = session.get('supabase_token')
+        refresh_token = session.get('supabase_refresh_token')
+        if not access_token or not refresh_token:
+            return access_token
+
+        expires_at = _token_expires_at(access_token)
+        if expires_at is not None and expires_at <= time.time() + 30:
+            try:
+                response = self.create_auth_client().refresh_session(refresh_token)
+                if response.session:
+                    self.set_session(response.session.access_token, response.session.refresh_token)
+                    return response.session.access_token
+            except Exception as e:
+                current_app.logger.warning(f"Could not refresh Supabase session: {e}")
+        return access_token
+
+    def get_service_client(self) -> RequestClient:
+        """Get the Supabase client with service role key (admin access).
+
+        One handle is shared process-wide; it carries no per-user state.
+        """
+        with self._lock:
+            if not self._service_client:
+                service_key = current_app.config['SUPABASE_SERVICE_ROLE_KEY']
+                self._service_client = RequestClient(self, service_key, api_key=service_key)
+            return self._service_client
+
     def set_session(self, access_token: str, refresh_token: str = None):
         """Set the current session tokens"""
         session['supabase_token'] = access_token
         if refresh_token:
             session['supabase_refresh_token'] = refresh_token
-    
+
     def clear_session(self):
         """Clear the current session tokens"""
         session.pop('supabase_token', None)
         session.pop('supabase_refresh_token', None)
-    
+
     def get_user(self):
         """Get the current authenticated user"""
         client = self.get_client()
-        return client.auth.get_user()
+        return client.auth.get_user(client.access_token)
 
 # Global instance
 supabase = SupabaseManager()
 
-def get_supabase() -> Client:
-    """Get the current Supabase client"""
+def get_supabase() -> RequestClient:
+    """Get the Supabase client for the current request"""
     return supabase.get_client()
 
-def get_service_supabase() -> Client:
+def get_service_supabase() -> RequestClient:
     """Get the service role Supabase client"""
     return supabase.get_service_client()
@@ -1,8 +1,11 @@
-from flask import render_template, redirect, url_for, flash, request, session
+from flask import render_template, redirect, url_for, flash, request, session, jsonify
 from flask_login import login_required, current_user
 from agentsdr.main import main_bp
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
+from agentsdr.core.queries import get_org_members_with_users, get_user_org_memberships, get_org_overview
 from agentsdr.core.rbac import get_user_organizations
+from agentsdr.core.org_cache import get_org_by_slug
+from agentsdr.services.jobs import get_job_queue
 
 @main_bp.route('/')
 def index():
@@ -26,38 +29,8 @@ def dashboard():
 
         print(f"🔍 Dashboard: User {current_user.email} (ID: {current_user.id})")
 
-        # Get Supabase client
-        from agentsdr.core.supabase_client import get_service_supabase
-        supabase = get_service_supabase()
-
-        # Get user's organization memberships
-        memberships_response = supabase.table('organization_members').select('org_id, role').eq('user_id', current_user.id).execute()
-        memberships = memberships_response.data or []
-
-        print(f"🔍 Dashboard: Found {len(memberships)} memberships")
-
-        # Get organization details
-        for membership in memberships:
-            try:
-                org_id = membership['org_id']
-                role = membership['role']
-
-                # Get organization details
-                org_response = supabase.table('organizations').select('*').eq('id', org_id).execute()
-
-                if org_response.data:
-                    org_data = org_response.data[0]
-                    organizations.append({
-                        'org': org_data,
-                        'role': role
-                    })
-                    print(f"✅ Added: {org_data['name']} (role: {role})")
-                else:
-                    print(f"⚠️ Organization not found: {org_id}")
-
-            except Exception as org_error:
-                print(f"❌ Error processing org {membership}: {org_error}")
-                continue
+        # Get user's organizations with their role in one query
+        organizations = get_user_org_memberships(current_user.id)
 
         print(f"🔍 Dashboard: Final count: {len(organizations)} organizations")
 
@@ -81,45 +54,28 @@ def org_dashboard(org_slug):
         supabase = get_supabase()
         
         # Get organization details
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_org_by_slug(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        organization = org_response.data[0]
-        
         # Check if user is a member
-        member_response = supabase.table('organization_members').select('*').eq('org_id', organization['id']).eq('user_id', current_user.id).execute()
+        member_response = supabase.table('organization_members').select('role').eq('org_id', organization['id']).eq('user_id', current_user.id).execute()
         if not member_response.data and not current_user.is_super_admin:
             flash('Access denied.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        # Get organization stats
-        records_count = supabase.table('records').select('id', count='exact').eq('org_id', organization['id']).execute()
-        members_count = supabase.table('organization_members').select('id', count='exact').eq('org_id', organization['id']).execute()
+        # Get organization stats and recent records in one round trip
+        overview = get_org_overview(organization['id'])
         
-        # Get recent records
-        recent_records = supabase.table('records').select('*').eq('org_id', organization['id']).order('created_at', desc=True).limit(10).execute()
-        
-        # Get members
-        members_response = supabase.table('organization_members').select('user_id, role, joined_at').eq('org_id', organization['id']).execute()
-        members = []
-        for member in members_response.data:
-            user_response = supabase.table('users').select('email, display_name').eq('id', member['user_id']).execute()
-            if user_response.data:
-                user_data = user_response.data[0]
-                members.append({
-                    'email': user_data['email'],
-                    'display_name': user_data.get('display_name'),
-                    'role': member['role'],
-                    'joined_at': member['joined_at']
-                })
+        # Get members with their user profiles in one query
+        members = get_org_members_with_users(organization['id'])
         
         return render_template('main/org_dashboard.html',
                              organization=organization,
-                             records_count=records_count.count if records_count.count else 0,
-                             members_count=members_count.count if members_count.count else 0,
-                             recent_records=recent_records.data,
+                             records_count=overview.get('records_count', 0),
+                             members_count=overview.get('members_count', 0),
+                             recent_records=overview.get('recent_records', []),
                              members=members)
     
     except Exception as e:
@@ -127,6 +83,24 @@ def org_dashboard(org_slug):
         return redirect(url_for('main.dashboard'))
 
 
+@main_bp.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    """Report the status of a background job started by the current user"""
+    job = get_job_queue().get(job_id)
+    if not job or (job.get('owner_id') != current_user.id and not current_user.is_super_admin):
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify({
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'result': job['result'],
+        'error': job['error']
+    })
+
+
 @main_bp.route('/agents')
 @login_required
 def all_agents():
@@ -134,27 +108,19 @@ def all_agents():
     try:
         supabase = get_service_supabase()
 
-        # Get all organizations where user is a member
-        memberships = supabase.table('organization_members').select('org_id, role').eq('user_id', current_user.id).execute()
-
-        if not memberships.data and not current_user.is_super_admin:
-            flash('You are not a member of any organizations.', 'info')
-            return render_template('main/all_agents.html', agents=[], organizations={})
-
-        # Collect organization IDs
-        org_ids = [m['org_id'] for m in memberships.data] if memberships.data else []
-
-        # If super admin, get all organizations
+        # Get organization details: every org for super admins, otherwise the user's memberships
         if current_user.is_super_admin:
-            all_orgs = supabase.table('organizations').select('id').execute()
-            org_ids.extend([org['id'] for org in all_orgs.data if org['id'] not in org_ids])
-
-        # Get organization details
-        organizations = {}
-        if org_ids:
-            orgs_response = supabase.table('organizations').select('id, name, slug').in_('id', org_ids).execute()
-            for org in orgs_response.data:
-                organizations[org['id']] = org
+            orgs_response = supabase.table('organizations').select('id, name, slug').execute()
+            org_list = orgs_response.data or []
+        else:
+            memberships = get_user_org_memberships(current_user.id, org_columns='id, name, slug')
+            if not memberships:
+                flash('You are not a member of any organizations.', 'info')
+                return render_template('main/all_agents.html', agents=[], organizations={})
+            org_list = [m['org'] for m in memberships]
+
+        organizations = {org['id']: org for org in org_list}
+        org_ids = list(organizations)
 
         # Get all agents from these organizations
         agents = []
@@ -1,13 +1,22 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify, current_app
+from flask import render_template, redirect, url_for, flash, request, jsonify, current_app, Response, stream_with_context, g
 from flask_login import login_required, current_user
+from werkzeug.exceptions import HTTPException
 from agentsdr.orgs import orgs_bp
 from agentsdr.core.supabase_client import get_supabase, get_service_supabase
-from agentsdr.core.rbac import require_org_admin, require_org_member, is_org_admin
+from agentsdr.core.queries import get_org_members_with_users, get_user_org_memberships, get_org_overview, \
+    invalidate_org_overview, INVITATION_COLUMNS
+from agentsdr.core.rbac import require_org_admin, require_org_member, is_org_admin, get_current_org
+from agentsdr.core.org_cache import get_org_by_id, invalidate_org
+from agentsdr.core.pagination import paginate_request
 from agentsdr.core.email import get_email_service
 from agentsdr.core.models import CreateOrganizationRequest, UpdateOrganizationRequest, CreateInvitationRequest
 from agentsdr.services.gmail_service import fetch_and_summarize_emails
+from agentsdr.services.summary_store import get_summary_run_store, new_summary_run
+from agentsdr.services.jobs import get_job_queue, JOB_SUCCEEDED, JOB_FAILED
 
 from datetime import datetime, timedelta
+import json
+import time
 import uuid
 import secrets
 
@@ -71,6 +80,7 @@ def create_organization():
 
                 current_app.logger.info(f"Adding organization member: {member_data}")
                 member_response = supabase.table('organization_members').insert(member_data).execute()
+                invalidate_org_overview(org_data['id'])
 
                 if member_response.data:
                     current_app.logger.info("Organization member added successfully")
@@ -112,13 +122,11 @@ def edit_organization(org_slug):
         supabase = get_supabase()
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
 
-        organization = org_response.data[0]
-
         if request.method == 'POST':
             try:
                 data = request.get_json()
@@ -138,6 +146,7 @@ def edit_organization(org_slug):
                 if update_data:
                     update_data['updated_at'] = datetime.utcnow().isoformat()
                     supabase.table('organizations').update(update_data).eq('id', organization['id']).execute()
+                    invalidate_org(organization)
 
                 flash('Organization updated successfully!', 'success')
                 return jsonify({'redirect': url_for('main.org_dashboard', org_slug=update_data.get('slug', org_slug))})
@@ -155,35 +164,22 @@ def edit_organization(org_slug):
 def manage_organization(org_slug):
     """Organization admin overview page with management actions"""
     try:
-        supabase = get_service_supabase()
-
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
-        organization = org_response.data[0]
 
-        # Counts and recent
-        members_count = supabase.table('organization_members').select('id', count='exact').eq('org_id', organization['id']).execute()
-        records_count = supabase.table('records').select('id', count='exact').eq('org_id', organization['id']).execute()
-        invites_count = supabase.table('invitations').select('id', count='exact').eq('org_id', organization['id']).execute()
-
-        recent_records = supabase.table('records').select('*').eq('org_id', organization['id']).order('created_at', desc=True).limit(5).execute()
-        # Agents count may fail if table not yet migrated
-        try:
-            agents_count_resp = supabase.table('agents').select('id', count='exact').eq('org_id', organization['id']).execute()
-            agents_count_val = agents_count_resp.count or 0
-        except Exception:
-            agents_count_val = 0
+        # Counts and recent records in one round trip
+        overview = get_org_overview(organization['id'])
 
         return render_template('orgs/manage.html',
                                organization=organization,
-                               members_count=members_count.count or 0,
-                               records_count=records_count.count or 0,
-                               invites_count=invites_count.count or 0,
-                               agents_count=agents_count_val,
-                               recent_records=recent_records.data or [])
+                               members_count=overview.get('members_count', 0),
+                               records_count=overview.get('records_count', 0),
+                               invites_count=overview.get('invites_count', 0),
+                               agents_count=overview.get('agents_count', 0),
+                               recent_records=overview.get('recent_records', [])[:5])
     except Exception as e:
         flash('Error loading organization.', 'error')
         return redirect(url_for('main.dashboard'))
@@ -192,27 +188,37 @@ def manage_organization(org_slug):
 @orgs_bp.route('/<org_slug>', methods=['DELETE'])
 @require_org_admin('org_slug')
 def delete_organization(org_slug):
-    """Delete organization and related data (admin only)."""
+    """Delete organization and related data (admin only).
+
+    The delete runs as a background job; poll ``status_url`` for completion.
+    """
     try:
-        supabase = get_service_supabase()
-        org_resp = supabase.table('organizations').select('id').eq('slug', org_slug).execute()
-        if not org_resp.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             return jsonify({'error': 'Organization not found'}), 404
-        org_id = org_resp.data[0]['id']
 
-        # Delete related rows first (basic cascade)
-        supabase.table('organization_members').delete().eq('org_id', org_id).execute()
-        supabase.table('invitations').delete().eq('org_id', org_id).execute()
-        supabase.table('records').delete().eq('org_id', org_id).execute()
+        job = get_job_queue().enqueue('org_delete', run_org_delete_job, organization,
+                                      owner_id=current_user.id, org_id=organization['id'])
 
-        # Delete organization
-        supabase.table('organizations').delete().eq('id', org_id).execute()
-
-        flash('Organization deleted successfully.', 'success')
-        return jsonify({'success': True})
+        flash('Organization deletion has been scheduled.', 'success')
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status_url': url_for('main.job_status', job_id=job['id'])
+        }), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+def run_org_delete_job(progress, organization):
+    """Background job: delete the organization and its data in one transaction"""
+    progress('deleting')
+    supabase = get_service_supabase()
+    response = supabase.rpc('delete_organization', {'p_org_id': organization['id']}).execute()
+    invalidate_org(organization)
+    invalidate_org_overview(organization['id'])
+    return {'deleted': response.data}
+
 @orgs_bp.route('/<org_slug>/agents', methods=['POST'])
 @require_org_admin('org_slug')
 def create_agent(org_slug):
@@ -244,11 +250,11 @@ def create_agent(org_slug):
 
         supabase = get_service_supabase()
         # Resolve slug -> id
-        org_resp = supabase.table('organizations').select('id').eq('slug', org_slug).limit(1).execute()
-        if not org_resp.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             current_app.logger.error(f"Organization not found: {org_slug}")
             return jsonify({'error': 'Organization not found'}), 404
-        org_id = org_resp.data[0]['id']
+        org_id = organization['id']
         current_app.logger.info(f"Found organization ID: {org_id}")
 
         # Create agent record
@@ -267,6 +273,7 @@ def create_agent(org_slug):
         current_app.logger.info(f"Creating agent: {agent}")
 
         result = supabase.table('agents').insert(agent).execute()
+        invalidate_org_overview(org_id)
         current_app.logger.info(f"Agent created successfully: {result}")
 
         return jsonify({'success': True})
@@ -280,16 +287,17 @@ def list_agents(org_slug):
     """List agents for an organization (records tagged as agents)."""
     try:
         supabase = get_service_supabase()
-        org_resp = supabase.table('organizations').select('*').eq('slug', org_slug).limit(1).execute()
-        if not org_resp.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
-        organization = org_resp.data[0]
 
         # For now: agents are records whose content JSON has agent_type
-        agents_resp = supabase.table('agents').select('*').eq('org_id', organization['id']).order('created_at', desc=True).execute()
-        agents = agents_resp.data or []
-        return render_template('orgs/agents.html', organization=organization, agents=agents)
+        page = paginate_request(supabase.table('agents').select('*').eq('org_id', organization['id']))
+        return render_template('orgs/agents.html', organization=organization, agents=page.items, page=page)
+    except HTTPException:
+        # Invalid pagination cursor (400)
+        raise
     except Exception as e:
         flash('Error loading agents.', 'error')
         return redirect(url_for('main.dashboard'))
@@ -300,28 +308,14 @@ def list_agents(org_slug):
 @require_org_member('org_slug')
 def list_members(org_slug):
     try:
-        supabase = get_supabase()
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
-        organization = org_response.data[0]
-
-        # Get members
-        members_response = supabase.table('organization_members').select('user_id, role, joined_at').eq('org_id', organization['id']).execute()
-        members = []
-        for member in members_response.data:
-            user_response = supabase.table('users').select('email, display_name').eq('id', member['user_id']).execute()
-            if user_response.data:
-                user_data = user_response.data[0]
-                members.append({
-                    'user_id': member['user_id'],
-                    'email': user_data['email'],
-                    'display_name': user_data.get('display_name'),
-                    'role': member['role'],
-                    'joined_at': member['joined_at']
-                })
+
+        # Get members with their user profiles in one query
+        members = get_org_members_with_users(organization['id'])
 
         return render_template('orgs/members.html', organization=organization, members=members)
 
@@ -356,11 +350,10 @@ def view_agent(org_slug, agent_id):
         supabase = get_service_supabase()
 
         # Get organization
-        org_resp = supabase.table('organizations').select('*').eq('slug', org_slug).limit(1).execute()
-        if not org_resp.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
-        organization = org_resp.data[0]
 
         # Get agent
         agent_resp = supabase.table('agents').select('*').eq('id', agent_id).eq('org_id', organization['id']).execute()
@@ -568,8 +561,13 @@ def test_gmail_connection(org_slug, agent_id):
         current_app.logger.info(f"Testing Gmail connection for agent {agent_id}")
         supabase = get_service_supabase()
 
+        # Get organization
+        organization = get_current_org(org_slug)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+
         # Get agent and verify it's an email_summarizer
-        agent_resp = supabase.table('agents').select('*').eq('id', agent_id).execute()
+        agent_resp = supabase.table('agents').select('*').eq('id', agent_id).eq('org_id', organization['id']).execute()
         if not agent_resp.data:
             return jsonify({'error': 'Agent not found'}), 404
 
@@ -584,12 +582,17 @@ def test_gmail_connection(org_slug, agent_id):
             return jsonify({'error': 'Gmail not connected'}), 400
 
         # Just test the connection by getting basic profile info
-        from agentsdr.services.gmail_service import GmailService
+        from agentsdr.services.gmail_service import GmailService, is_auth_error, invalidate_gmail_credentials
         gmail_service = GmailService()
         service = gmail_service.build_gmail_service(refresh_token)
         
         # Test with a simple profile call
-        profile = service.users().getProfile(userId='me').execute()
+        try:
+            profile = service.users().getProfile(userId='me').execute()
+        except Exception as e:
+            if is_auth_error(e):
+                invalidate_gmail_credentials(refresh_token)
+            raise
         
         return jsonify({
             'success': True,
@@ -618,13 +621,24 @@ def summarize_emails(org_slug, agent_id):
             data = {'type': 'last_24_hours', 'count': 10}
 
         criteria_type = data.get('type', 'last_24_hours')
-        count = data.get('count', 10)
+        max_count = current_app.config.get('SUMMARY_MAX_COUNT', 100)
+        try:
+            count = int(data.get('count', 10))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Count must be a number'}), 400
+        if not 1 <= count <= max_count:
+            return jsonify({'error': f'Count must be between 1 and {max_count}'}), 400
         current_app.logger.info(f"Criteria: type={criteria_type}, count={count}")
 
         supabase = get_service_supabase()
 
+        # Get organization
+        organization = get_current_org(org_slug)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+
         # Get agent and verify it's an email_summarizer
-        agent_resp = supabase.table('agents').select('*').eq('id', agent_id).execute()
+        agent_resp = supabase.table('agents').select('*').eq('id', agent_id).eq('org_id', organization['id']).execute()
         if not agent_resp.data:
             return jsonify({'error': 'Agent not found'}), 404
 
@@ -647,37 +661,23 @@ def summarize_emails(org_slug, agent_id):
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API not configured. Please set the OPENAI_API_KEY environment variable.'}), 500
 
-        # Fetch and summarize emails
-        try:
-            current_app.logger.info(f"Starting email summarization for agent {agent_id}")
-            summaries = fetch_and_summarize_emails(refresh_token, criteria_type, count)
-            
-            current_app.logger.info(f"Email summarization completed successfully with {len(summaries)} summaries")
-
-            # Store summaries in session for the dedicated summaries page
-            from flask import session
-            session[f'summaries_{agent_id}'] = {
-                'summaries': summaries,
-                'criteria_type': criteria_type,
-                'count': count,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+        # Fetch and summarize emails in a background job; the client polls the status URL
+        # or follows the events URL to see summaries as they are ready
+        job = get_job_queue().enqueue(
+            'email_summary', run_summary_job,
+            agent['org_id'], agent_id, current_user.id, refresh_token, criteria_type, count,
+            config.get('gmail_history_id'), config.get('email_cleaning'),
+            owner_id=current_user.id, org_id=agent['org_id'], agent_id=agent_id, criteria_type=criteria_type
+        )
+        current_app.logger.info(f"Queued email summarization job {job['id']} for agent {agent_id}")
 
-            return jsonify({
-                'success': True,
-                'redirect_url': url_for('orgs.view_summaries', org_slug=org_slug, agent_id=agent_id),
-                'count': len(summaries)
-            })
-            
-        except Exception as fetch_error:
-            current_app.logger.error(f"Error in email fetching/summarization: {fetch_error}")
-            # Check if it's a token-related error
-            if 'token' in str(fetch_error).lower() or 'auth' in str(fetch_error).lower():
-                return jsonify({'error': 'Gmail authentication failed. Please reconnect your Gmail account.'}), 401
-            elif 'quota' in str(fetch_error).lower() or 'rate' in str(fetch_error).lower():
-                return jsonify({'error': 'Rate limit exceeded. Please try again in a few minutes.'}), 429
-            else:
-                return jsonify({'error': f'Failed to fetch emails: {str(fetch_error)}'}), 500
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status_url': url_for('orgs.summary_job_status', org_slug=org_slug, agent_id=agent_id, job_id=job['id']),
+            'events_url': url_for('orgs.summary_job_events', org_slug=org_slug, agent_id=agent_id, job_id=job['id']),
+            'summaries_url': url_for('orgs.view_summaries', org_slug=org_slug, agent_id=agent_id, job=job['id'])
+        }), 202
 
     except Exception as e:
         current_app.logger.error(f"Error in summarize_emails endpoint: {e}")
@@ -686,6 +686,124 @@ def summarize_emails(org_slug, agent_id):
         return jsonify({'error': 'An unexpected error occurred. Please try again.'}), 500
 
 
+@orgs_bp.route('/<org_slug>/agents/<agent_id>/emails/jobs/<job_id>/events', methods=['GET'])
+@require_org_member('org_slug')
+def summary_job_events(org_slug, agent_id, job_id):
+    """Relay a summarization job's events to the browser as Server-Sent Events.
+
+    The work itself runs in the job queue; this only forwards the summaries
+    the job publishes, then a final 'done' or 'error' event. Idle polls send
+    a keepalive comment so a disconnected client is noticed, and each stream
+    ends after SUMMARY_STREAM_TIMEOUT; reconnecting clients resume after the
+    Last-Event-ID they received.
+    """
+    queue = get_job_queue()
+    job = get_org_summary_job(queue, agent_id, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    start = request.headers.get('Last-Event-ID', -1, type=int) + 1
+    poll_interval = current_app.config.get('SUMMARY_STREAM_POLL_INTERVAL', 0.5)
+    deadline = time.monotonic() + current_app.config.get('SUMMARY_STREAM_TIMEOUT', 90)
+
+    def sse(event, data, event_id=None):
+        prefix = f"id: {event_id}\n" if event_id is not None else ''
+        return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    def generate():
+        position = start
+        while time.monotonic() < deadline:
+            # Read the status before the events: a finished job has published everything
+            current = queue.get(job_id)
+            events = queue.events(job_id, position)
+            for event in events:
+                yield sse(event['event'], event['data'], position)
+                position += 1
+            if current is None:
+                yield sse('error', {'error': 'Summarization job expired.'})
+                return
+            if current['status'] == JOB_SUCCEEDED:
+                yield sse('done', {
+                    'run_id': current['result']['run_id'],
+                    'count': current['result']['count'],
+                    'run_url': url_for('orgs.view_summaries', org_slug=org_slug, agent_id=agent_id,
+                                       run=current['result']['run_id'])
+                })
+                return
+            if current['status'] == JOB_FAILED:
+                message, _ = describe_summary_error(current['error'])
+                yield sse('error', {'error': message})
+                return
+            if not events:
+                # Writing something is the only way to find out the client has gone
+                yield ": keepalive\n\n"
+            time.sleep(poll_interval)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def get_org_summary_job(queue, agent_id, job_id):
+    """The summarization job, if it belongs to this agent in the current organization"""
+    job = queue.get(job_id)
+    if not job or job.get('agent_id') != agent_id or job.get('org_id') != (g.organization or {}).get('id'):
+        return None
+    return job
+
+
+def run_summary_job(progress, org_id, agent_id, user_id, refresh_token, criteria_type, count, history_id,
+                    cleaning_options=None):
+    """Background job body: fetch, summarize and store a summary run"""
+    current_app.logger.info(f"Starting email summarization for agent {agent_id}")
+
+    def on_summary(position, summary, total):
+        progress.publish('summary', {'position': position, 'total': total, 'summary': summary})
+
+    summaries = fetch_and_summarize_emails(refresh_token, criteria_type, count, agent_id=agent_id,
+                                           history_id=history_id, progress=progress,
+                                           cleaning_options=cleaning_options, on_summary=on_summary)
+    current_app.logger.info(f"Email summarization completed successfully with {len(summaries)} summaries")
+
+    # Store the run server-side so any org member can open the summaries page
+    run = new_summary_run(org_id, agent_id, user_id, criteria_type, count, summaries)
+    get_summary_run_store().save_run(run)
+    return {'run_id': run['id'], 'count': len(summaries)}
+
+
+def describe_summary_error(error: str):
+    """Map a summarization failure to a user-facing message and HTTP status"""
+    lowered = (error or '').lower()
+    # Check if it's a token-related error
+    if 'token' in lowered or 'auth' in lowered:
+        return 'Gmail authentication failed. Please reconnect your Gmail account.', 401
+    elif 'quota' in lowered or 'rate' in lowered:
+        return 'Rate limit exceeded. Please try again in a few minutes.', 429
+    return f'Failed to fetch emails: {error}', 500
+
+
+@orgs_bp.route('/<org_slug>/agents/<agent_id>/emails/jobs/<job_id>', methods=['GET'])
+@require_org_member('org_slug')
+def summary_job_status(org_slug, agent_id, job_id):
+    """Report progress and, once finished, the result of a summarization job"""
+    job = get_org_summary_job(get_job_queue(), agent_id, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    payload = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'progress': job['progress']
+    }
+    if job['status'] == JOB_SUCCEEDED:
+        payload['count'] = job['result']['count']
+        payload['redirect_url'] = url_for('orgs.view_summaries', org_slug=org_slug, agent_id=agent_id,
+                                          run=job['result']['run_id'])
+    elif job['status'] == JOB_FAILED:
+        current_app.logger.error(f"Error in email fetching/summarization: {job['error']}")
+        payload['error'], payload['error_status'] = describe_summary_error(job['error'])
+    return jsonify(payload)
+
+
 @orgs_bp.route('/<org_slug>/agents/<agent_id>/summaries', methods=['GET'])
 @require_org_member('org_slug')
 def view_summaries(org_slug, agent_id):
@@ -694,11 +812,10 @@ def view_summaries(org_slug, agent_id):
         supabase = get_service_supabase()
 
         # Get organization
-        org_resp = supabase.table('organizations').select('*').eq('slug', org_slug).limit(1).execute()
-        if not org_resp.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
-        organization = org_resp.data[0]
 
         # Get agent
         agent_resp = supabase.table('agents').select('*').eq('id', agent_id).eq('org_id', organization['id']).execute()
@@ -713,18 +830,50 @@ def view_summaries(org_slug, agent_id):
             config = agent.get('config', {})
             gmail_connected = bool(config.get('gmail_refresh_token'))
 
-        # Get summaries from session
-        from flask import session
-        summaries_data = session.get(f'summaries_{agent_id}', {})
-        summaries = summaries_data.get('summaries', [])
-        criteria_type = summaries_data.get('criteria_type', 'last_24_hours')
+        # ?job=<id> renders an empty page that fills in from the job's events
+        stream = None
+        if request.args.get('job'):
+            job = get_org_summary_job(get_job_queue(), agent_id, request.args['job'])
+            if job:
+                stream = {
+                    'type': job.get('criteria_type') or 'last_24_hours',
+                    'events_url': url_for('orgs.summary_job_events', org_slug=org_slug, agent_id=agent_id,
+                                          job_id=job['id'])
+                }
+            else:
+                flash('Summarization job not found or expired.', 'error')
+
+        # Load the requested run, or the agent's latest one
+        store = get_summary_run_store()
+        runs = store.list_runs(agent_id)
+        run_id = None if stream else request.args.get('run') or (runs[0]['id'] if runs else None)
+        run = store.get_run(run_id) if run_id else None
+        if run and run['agent_id'] != agent_id:
+            run = None
+        if request.args.get('run') and not run:
+            flash('Summary run not found or expired.', 'error')
+
+        all_summaries = run['summaries'] if run else []
+        criteria_type = stream['type'] if stream else run['criteria_type'] if run else 'last_24_hours'
+
+        # Paginate summaries within the run
+        per_page = current_app.config.get('SUMMARIES_PER_PAGE', 20)
+        total_pages = max(1, (len(all_summaries) + per_page - 1) // per_page)
+        page = min(max(request.args.get('page', 1, type=int), 1), total_pages)
+        summaries = all_summaries[(page - 1) * per_page:page * per_page]
 
         return render_template('orgs/email_summaries.html',
                              organization=organization,
                              agent=agent,
                              gmail_connected=gmail_connected,
                              summaries=summaries,
-                             criteria_type=criteria_type)
+                             total_summaries=len(all_summaries),
+                             criteria_type=criteria_type,
+                             run=run,
+                             runs=runs,
+                             stream=stream,
+                             page=page,
+                             total_pages=total_pages)
 
     except Exception as e:
         current_app.logger.error(f"Error viewing summaries: {e}")
@@ -737,7 +886,14 @@ def view_summaries(org_slug, agent_id):
 def delete_agent(org_slug, agent_id):
     try:
         supabase = get_service_supabase()
-        supabase.table('agents').delete().eq('id', agent_id).execute()
+
+        # Get organization
+        organization = get_current_org(org_slug)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+
+        supabase.table('agents').delete().eq('id', agent_id).eq('org_id', organization['id']).execute()
+        invalidate_org_overview(organization['id'])
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -749,18 +905,17 @@ def remove_member(org_slug, user_id):
         supabase = get_supabase()
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             return jsonify({'error': 'Organization not found'}), 404
 
-        organization = org_response.data[0]
-
         # Check if user is trying to remove themselves
         if user_id == current_user.id:
             return jsonify({'error': 'Cannot remove yourself from the organization'}), 400
 
         # Remove member
         supabase.table('organization_members').delete().eq('org_id', organization['id']).eq('user_id', user_id).execute()
+        invalidate_org_overview(organization['id'])
 
         flash('Member removed successfully.', 'success')
         return jsonify({'success': True})
@@ -781,12 +936,10 @@ def update_member_role(org_slug, user_id):
         supabase = get_supabase()
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             return jsonify({'error': 'Organization not found'}), 404
 
-        organization = org_response.data[0]
-
         # Update member role
         supabase.table('organization_members').update({'role': new_role}).eq('org_id', organization['id']).eq('user_id', user_id).execute()
 
@@ -803,18 +956,19 @@ def list_invitations(org_slug):
         supabase = get_supabase()
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
 
-        organization = org_response.data[0]
-
         # Get invitations
-        invitations_response = supabase.table('invitations').select('*').eq('org_id', organization['id']).order('created_at', desc=True).execute()
+        page = paginate_request(supabase.table('invitations').select(INVITATION_COLUMNS).eq('org_id', organization['id']))
 
-        return render_template('orgs/invitations.html', organization=organization, invitations=invitations_response.data)
+        return render_template('orgs/invitations.html', organization=organization, invitations=page.items, page=page)
 
+    except HTTPException:
+        # Invalid pagination cursor (400)
+        raise
     except Exception as e:
         flash('Error loading invitations.', 'error')
         return redirect(url_for('main.dashboard'))
@@ -829,12 +983,10 @@ def create_invitation(org_slug):
         supabase = get_supabase()
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             return jsonify({'error': 'Organization not found'}), 404
 
-        organization = org_response.data[0]
-
         # Check if user is already a member
         existing_member = supabase.table('organization_members').select('*').eq('org_id', organization['id']).eq('user_id', invite_request.email).execute()
         if existing_member.data:
@@ -863,6 +1015,8 @@ def create_invitation(org_slug):
         invitation_response = supabase.table('invitations').insert(invitation_data).execute()
 
         if invitation_response.data:
+            invalidate_org_overview(organization['id'])
+
             # Send invitation email
             email_sent = get_email_service().send_invitation_email(
                 invite_request.email,
@@ -898,12 +1052,10 @@ def resend_invitation(org_slug, invitation_id):
         invitation = invitation_response.data[0]
 
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('id', invitation['org_id']).execute()
-        if not org_response.data:
+        organization = get_org_by_id(invitation['org_id'])
+        if not organization:
             return jsonify({'error': 'Organization not found'}), 404
 
-        organization = org_response.data[0]
-
         # Resend invitation email
         email_sent = get_email_service().send_invitation_email(
             invitation['email'],
@@ -927,20 +1079,9 @@ def resend_invitation(org_slug, invitation_id):
 def my_organizations():
     """List organizations where the current user is admin"""
     try:
-        supabase = get_service_supabase()
-
-        # Get memberships where user is admin
-        memberships = supabase.table('organization_members').select('org_id, role').eq('user_id', current_user.id).eq('role', 'admin').execute()
-
-        # Collect org details
-        orgs = []
-        for m in memberships.data or []:
-            org_resp = supabase.table('organizations').select('id, name, slug, owner_user_id, created_at').eq('id', m['org_id']).execute()
-            if org_resp.data:
-                orgs.append({
-                    'org': org_resp.data[0],
-                    'role': m['role']
-                })
+        # Get organizations where user is admin, in one query
+        orgs = get_user_org_memberships(current_user.id, role='admin',
+                                        org_columns='id, name, slug, owner_user_id, created_at')
 
         return render_template('orgs/mine.html', organizations=orgs)
     except Exception as e:
@@ -955,8 +1096,14 @@ def revoke_invitation(org_slug, invitation_id):
     try:
         supabase = get_supabase()
 
+        # Get organization
+        organization = get_current_org(org_slug)
+        if not organization:
+            return jsonify({'error': 'Organization not found'}), 404
+
         # Delete invitation
-        supabase.table('invitations').delete().eq('id', invitation_id).execute()
+        supabase.table('invitations').delete().eq('id', invitation_id).eq('org_id', organization['id']).execute()
+        invalidate_org_overview(organization['id'])
 
         flash('Invitation revoked successfully.', 'success')
         return jsonify({'success': True})
@@ -1,9 +1,12 @@
 from flask import render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
+from werkzeug.exceptions import HTTPException
 from agentsdr.records import records_bp
 from agentsdr.core.supabase_client import get_supabase
-from agentsdr.core.rbac import require_org_member, can_access_org_data
+from agentsdr.core.rbac import require_org_member, can_access_org_data, get_current_org
 from agentsdr.core.models import CreateRecordRequest, UpdateRecordRequest
+from agentsdr.core.pagination import paginate_request
+from agentsdr.core.queries import RECORD_LIST_COLUMNS, RECORD_DETAIL_COLUMNS, invalidate_org_overview
 from datetime import datetime
 import uuid
 
@@ -14,18 +17,19 @@ def list_records(org_slug):
         supabase = get_supabase()
         
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        organization = org_response.data[0]
-        
         # Get records
-        records_response = supabase.table('records').select('*').eq('org_id', organization['id']).order('created_at', desc=True).execute()
+        page = paginate_request(supabase.table('records').select(RECORD_LIST_COLUMNS).eq('org_id', organization['id']))
         
-        return render_template('records/list.html', organization=organization, records=records_response.data)
+        return render_template('records/list.html', organization=organization, records=page.items, page=page)
     
+    except HTTPException:
+        # Invalid pagination cursor (400)
+        raise
     except Exception as e:
         flash('Error loading records.', 'error')
         return redirect(url_for('main.dashboard'))
@@ -37,13 +41,11 @@ def create_record(org_slug):
         supabase = get_supabase()
         
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        organization = org_response.data[0]
-        
         if request.method == 'POST':
             try:
                 data = request.get_json()
@@ -63,6 +65,7 @@ def create_record(org_slug):
                 record_response = supabase.table('records').insert(record_data).execute()
                 
                 if record_response.data:
+                    invalidate_org_overview(organization['id'])
                     flash('Record created successfully!', 'success')
                     return jsonify({'redirect': url_for('records.list_records', org_slug=org_slug)})
                 else:
@@ -84,15 +87,13 @@ def view_record(org_slug, record_id):
         supabase = get_supabase()
         
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        organization = org_response.data[0]
-        
         # Get record
-        record_response = supabase.table('records').select('*').eq('id', record_id).eq('org_id', organization['id']).execute()
+        record_response = supabase.table('records').select(RECORD_DETAIL_COLUMNS).eq('id', record_id).eq('org_id', organization['id']).execute()
         if not record_response.data:
             flash('Record not found.', 'error')
             return redirect(url_for('records.list_records', org_slug=org_slug))
@@ -116,15 +117,13 @@ def edit_record(org_slug, record_id):
         supabase = get_supabase()
         
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             flash('Organization not found.', 'error')
             return redirect(url_for('main.dashboard'))
         
-        organization = org_response.data[0]
-        
         # Get record
-        record_response = supabase.table('records').select('*').eq('id', record_id).eq('org_id', organization['id']).execute()
+        record_response = supabase.table('records').select(RECORD_DETAIL_COLUMNS).eq('id', record_id).eq('org_id', organization['id']).execute()
         if not record_response.data:
             flash('Record not found.', 'error')
             return redirect(url_for('records.list_records', org_slug=org_slug))
@@ -145,6 +144,7 @@ def edit_record(org_slug, record_id):
                 if update_data:
                     update_data['updated_at'] = datetime.utcnow().isoformat()
                     supabase.table('records').update(update_data).eq('id', record_id).execute()
+                    invalidate_org_overview(organization['id'])
                 
                 flash('Record updated successfully!', 'success')
                 return jsonify({'redirect': url_for('records.view_record', org_slug=org_slug, record_id=record_id)})
@@ -165,14 +165,13 @@ def delete_record(org_slug, record_id):
         supabase = get_supabase()
         
         # Get organization
-        org_response = supabase.table('organizations').select('*').eq('slug', org_slug).execute()
-        if not org_response.data:
+        organization = get_current_org(org_slug)
+        if not organization:
             return jsonify({'error': 'Organization not found'}), 404
         
-        organization = org_response.data[0]
-        
         # Delete record
         supabase.table('records').delete().eq('id', record_id).eq('org_id', organization['id']).execute()
+        invalidate_org_overview(organization['id'])
         
         flash('Record deleted successfully.', 'success')
         return jsonify({'success': True})
@@ -0,0 +1,372 @@
+"""
+Email body extraction and cleaning for summarization
+"""
+import base64
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from flask import current_app, has_app_context
+from agentsdr.core.cache import TTLCache
+
+# Everything after one of these markers is a signature or client footer.
+# Alternatives are bounded so one search over the capped body finds the
+# earliest cut point without backtracking across the whole message.
+SIGNATURE_PATTERNS = (
+    r'\n--[ \t]*\n',              # Standard signature delimiter
+    r'\nbest regards',
+    r'\nsincerely',
+    r'\nthanks[^\n]*\n[^@]*@',    # "Thanks" followed by contact details
+    r'\nsent from my',
+    r'\n\[[^\]]*\]',              # Email client footers
+)
+
+_BLANK_LINES = re.compile(r'\n\s*\n')
+
+DEFAULT_MAX_CHARS = 2000
+MAX_CHARS_LIMIT = 20000
+# Agent-supplied signature patterns are user input: cap how many and how long
+MAX_EXTRA_PATTERNS = 20
+MAX_EXTRA_PATTERN_LENGTH = 200
+# A quantified group that itself contains a quantifier, e.g. (a+)+ or (\w*x)*,
+# can backtrack exponentially; such patterns are rejected
+_NESTED_QUANTIFIER = re.compile(r'\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)[+*{]')
+# Raw text kept before cleaning, relative to max_chars; signatures and blank
+# lines rarely shrink a body by more than this
+SCAN_FACTOR = 4
+
+
+class EmailCleaner:
+    """Precompiled cleaning pipeline: cap, cut at the first signature, collapse blank lines, truncate"""
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS, strip_signatures: bool = True,
+                 extra_signature_patterns: Tuple[str, ...] = ()):
+        self.max_chars = max_chars
+        self.scan_chars = max_chars * SCAN_FACTOR
+        if strip_signatures:
+            self.signature = re.compile('|'.join(f'(?:{p})' for p in SIGNATURE_PATTERNS), re.IGNORECASE)
+            # Compiled one by one so an invalid pattern only drops itself
+            self.extra_signatures = [c for c in map(_compile_extra_pattern, extra_signature_patterns) if c]
+        else:
+            self.signature = None
+            self.extra_signatures = []
+
+    def clean(self, body: str) -> str:
+        """Clean email body by removing signatures, footers, etc."""
+        if not body:
+            return ""
+
+        cleaned = body[:self.scan_chars]
+        if self.signature is not None:
+            match = self.signature.search(cleaned)
+            if match:
+                cleaned = cleaned[:match.start()]
+        # Each extra pattern only scans what is left before the earliest cut so far
+        for pattern in self.extra_signatures:
+            match = pattern.search(cleaned)
+            if match:
+                cleaned = cleaned[:match.start()]
+
+        cleaned = _BLANK_LINES.sub('\n\n', cleaned).strip()
+
+        # Limit length for summarization
+        if len(cleaned) > self.max_chars:
+            cleaned = cleaned[:self.max_chars] + "..."
+        return cleaned
+
+
+def _warn(message: str):
+    if has_app_context():
+        current_app.logger.warning(message)
+
+
+def _compile_extra_pattern(pattern: str) -> Optional['re.Pattern']:
+    """Compile one agent-supplied signature pattern, or None (logged) if it is unusable"""
+    if len(pattern) > MAX_EXTRA_PATTERN_LENGTH:
+        _warn(f"Ignoring signature pattern longer than {MAX_EXTRA_PATTERN_LENGTH} characters")
+        return None
+    if _NESTED_QUANTIFIER.search(pattern):
+        _warn(f"Ignoring signature pattern with nested quantifiers: {pattern!r}")
+        return None
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        _warn(f"Ignoring invalid signature pattern {pattern!r}: {e}")
+        return None
+
+
+def _cleaner_key(options: Dict[str, Any]) -> Tuple[int, bool, Tuple[str, ...]]:
+    """Validated (max_chars, strip_signatures, extra_signature_patterns) for an ``email_cleaning`` config"""
+    max_chars = options.get('max_chars', DEFAULT_MAX_CHARS)
+    if isinstance(max_chars, bool) or not isinstance(max_chars, int) or not 0 < max_chars <= MAX_CHARS_LIMIT:
+        _warn(f"Invalid email_cleaning max_chars {max_chars!r}, using {DEFAULT_MAX_CHARS}")
+        max_chars = DEFAULT_MAX_CHARS
+
+    patterns = options.get('extra_signature_patterns') or ()
+    if isinstance(patterns, str) or not isinstance(patterns, (list, tuple)):
+        _warn("email_cleaning extra_signature_patterns must be a list of strings")
+        patterns = ()
+    patterns = tuple(p for p in patterns if isinstance(p, str) and p)[:MAX_EXTRA_PATTERNS]
+
+    return max_chars, bool(options.get('strip_signatures', True)), patterns
+
+
+# Bounded so agents with ever-changing configs cannot grow it without limit
+_cleaners = TTLCache(maxsize=128, ttl=3600)
+
+
+def get_email_cleaner(options: Optional[Dict[str, Any]] = None) -> EmailCleaner:
+    """Get the cleaner for an agent's ``email_cleaning`` config, compiled once per distinct config.
+
+    Supported keys: ``max_chars`` (1 to MAX_CHARS_LIMIT), ``strip_signatures``
+    and ``extra_signature_patterns`` (regexes; a match cuts the rest of the
+    body). Invalid values are logged and replaced by the defaults.
+    """
+    key = _cleaner_key(options or {})
+    cleaner = _cleaners.get(key)
+    if cleaner is None:
+        cleaner = EmailCleaner(*key)
+        _cleaners.set(key, cleaner)
+    return cleaner
+
+
+# HTML elements whose content is never message text
+SKIPPED_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'title'})
+# Elements that start a new line of text
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'table', 'td', 'th', 'tr', 'ul'
+})
+STREAM_CHUNK_SIZE = 16384
+
+
+class _TextCollector(HTMLParser):
+    """html.parser handler that keeps text outside skipped elements, up to a limit"""
+
+    def __init__(self, limit: Optional[int]):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts: List[str] = []
+        self.size = 0
+        self._skip_depth = 0
+
+    @property
+    def done(self) -> bool:
+        return self.limit is not None and self.size >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth and not self.done:
+            self.parts.append(data)
+            self.size += len(data)
+
+
+def _stream_to_text(html: str, limit: Optional[int]) -> str:
+    """Standard library extractor; stops feeding the parser once ``limit`` chars of text are collected"""
+    collector = _TextCollector(limit)
+    for start in range(0, len(html), STREAM_CHUNK_SIZE):
+        collector.feed(html[start:start + STREAM_CHUNK_SIZE])
+        if collector.done:
+            break
+    else:
+        collector.close()
+    return ''.join(collector.parts)
+
+
+def _lxml_to_text(html: str, limit: Optional[int]) -> str:
+    """lxml extractor; the pull parser is fed in chunks and stops once enough text has been parsed"""
+    from lxml import etree
+
+    parser = etree.HTMLPullParser(events=('end',))
+    parsed = 0
+    for start in range(0, len(html), STREAM_CHUNK_SIZE):
+        parser.feed(html[start:start + STREAM_CHUNK_SIZE])
+        for _, element in parser.read_events():
+            if isinstance(element.tag, str) and element.tag not in SKIPPED_TAGS:
+                parsed += len(element.text or '')
+            parsed += len(element.tail or '')
+        if limit is not None and parsed >= limit:
+            break
+    # close() recovers a partial document and returns its root (None if there were no elements)
+    root = parser.close()
+    if root is None:
+        return ''
+
+    etree.strip_elements(root, *SKIPPED_TAGS, with_tail=False)
+    parts = []
+    size = 0
+    for event, element in etree.iterwalk(root, events=('start', 'end')):
+        if not isinstance(element.tag, str):
+            # Comments and processing instructions: only their tail is text
+            text = element.tail if event == 'end' else None
+        else:
+            if element.tag in BLOCK_TAGS:
+                parts.append('\n')
+            text = element.text if event == 'start' else element.tail
+        if text:
+            parts.append(text)
+            size += len(text)
+            if limit is not None and size >= limit:
+                break
+    return ''.join(parts)
+
+
+def _selectolax_to_text(html: str, limit: Optional[int]) -> str:
+    """selectolax (lexbor) extractor; walks the tree so only block elements start new lines"""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIPPED_TAGS))
+    root = tree.body or tree.root
+    if root is None:
+        return ''
+
+    parts = []
+    size = 0
+    # Explicit stack of (node, closing) so deeply nested mail does not hit the recursion limit
+    stack = [(child, False) for child in reversed(list(root.iter(include_text=True)))]
+    while stack:
+        node, closing = stack.pop()
+        if node.tag == '-text':
+            text = node.text(deep=False)
+            if text:
+                parts.append(text)
+                size += len(text)
+                if limit is not None and size >= limit:
+                    break
+        elif closing:
+            parts.append('\n')
+        elif not node.tag.startswith('-'):  # Skip comments
+            if node.tag in BLOCK_TAGS:
+                parts.append('\n')
+                stack.append((node, True))
+            stack.extend((child, False) for child in reversed(list(node.iter(include_text=True))))
+    return ''.join(parts)
+
+
+# Backends in order of preference: module to import -> extractor
+HTML_EXTRACTORS: Dict[str, Tuple[Optional[str], Callable[[str, Optional[int]], str]]] = {
+    'selectolax': ('selectolax.lexbor', _selectolax_to_text),
+    'lxml': ('lxml.etree', _lxml_to_text),
+    'stream': (None, _stream_to_text),
+}
+_available_extractors: Dict[str, bool] = {}
+
+
+def extractor_available(name: str) -> bool:
+    """Whether the backend's optional dependency is installed"""
+    if name not in _available_extractors:
+        module = HTML_EXTRACTORS[name][0]
+        if module is None:
+            _available_extractors[name] = True
+        else:
+            try:
+                __import__(module)
+                _available_extractors[name] = True
+            except ImportError:
+                _available_extractors[name] = False
+    return _available_extractors[name]
+
+
+def get_html_extractor(backend: str = 'auto') -> str:
+    """Name of the extractor to use: the requested backend if installed, else the fastest available"""
+    if backend != 'auto' and backend in HTML_EXTRACTORS and extractor_available(backend):
+        return backend
+    return next(name for name in HTML_EXTRACTORS if extractor_available(name))
+
+
+def html_to_text(html: str, limit: Optional[int] = None, backend: str = 'auto') -> str:
+    """Convert HTML to plain text, skipping scripts and styles.
+
+    ``limit`` is the number of text characters needed; the lxml and stream
+    extractors stop parsing once that much has been collected (selectolax
+    parses the whole document, which is still faster, and stops walking it)
+    and the result is cut to it. Every backend starts a new line only at
+    BLOCK_TAGS, so inline markup does not split sentences. If a backend fails on a document, the stream extractor is used.
+    """
+    if not html:
+        return ''
+    name = get_html_extractor(backend)
+    try:
+        text = HTML_EXTRACTORS[name][1](html, limit)
+    except Exception as e:
+        if name == 'stream':
+            raise
+        if has_app_context():
+            current_app.logger.warning(f"{name} could not extract text from HTML, using stream: {e}")
+        text = _stream_to_text(html, limit)
+    return text if limit is None else text[:limit]
+
+
+_CHARSET = re.compile(r'charset\s*=\s*"?([^";\s]+)', re.IGNORECASE)
+
+
+def _header(part: Dict[str, Any], name: str) -> str:
+    name = name.lower()
+    return next((h['value'] for h in part.get('headers', []) if h['name'].lower() == name), '')
+
+
+def is_attachment(part: Dict[str, Any]) -> bool:
+    """Whether a Gmail message part is an attachment rather than body text"""
+    if part.get('filename') or part.get('body', {}).get('attachmentId'):
+        return True
+    return _header(part, 'Content-Disposition').lower().startswith('attachment')
+
+
+def iter_text_parts(part: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield the text/plain and text/html leaves of a Gmail payload, depth first.
+
+    Nested multiparts (e.g. multipart/alternative inside multipart/mixed)
+    are walked recursively; attachments are skipped without being decoded.
+    """
+    if is_attachment(part):
+        return
+    children = part.get('parts')
+    if children:
+        for child in children:
+            yield from iter_text_parts(child)
+    elif part.get('mimeType', '').lower() in ('text/plain', 'text/html'):
+        yield part
+
+
+def select_body_part(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The first non-empty text/plain part, else the first non-empty text/html part"""
+    html_part = None
+    for part in iter_text_parts(payload):
+        if not part.get('body', {}).get('data'):
+            continue
+        if part['mimeType'].lower() == 'text/plain':
+            return part
+        if html_part is None:
+            html_part = part
+    return html_part
+
+
+def part_charset(part: Dict[str, Any]) -> str:
+    """Charset declared in the part's Content-Type header, if Python knows it, else utf-8"""
+    match = _CHARSET.search(_header(part, 'Content-Type'))
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+def decode_part(part: Dict[str, Any]) -> str:
+    """Decode a part's base64url body using its declared charset"""
+    data = part.get('body', {}).get('data', '')
+    raw = base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+    return raw.decode(part_charset(part), errors='replace')
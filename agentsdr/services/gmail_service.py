@@ -2,85 +2,164 @@
 Gmail API service for fetching and processing emails
 """
 import os
-import base64
+import hashlib
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Tuple, Callable, Iterator
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import openai
 from flask import current_app
+from agentsdr.core.cache import TTLCache
+from agentsdr.core.supabase_client import get_service_supabase
+from agentsdr.core.http import get_requests_session, get_google_http
+from agentsdr.services.email_parsing import decode_part, get_email_cleaner, html_to_text, select_body_part
+from agentsdr.services.summary_cache import get_summary_cache, summary_cache_key
+
+# openai.OpenAI clients are thread-safe and keep a pooled HTTP connection,
+# so one client per API key is shared by all requests and worker threads
+_openai_clients = {}
+_openai_clients_lock = threading.Lock()
+
+# Headers requested when sorting candidates by metadata before fetching full bodies
+METADATA_HEADERS = ['From', 'Subject', 'Date']
+
+# Gmail credentials are shared process-wide, keyed by a hash of the refresh
+# token, so access tokens are reused across requests until they near expiry
+_credentials_cache = None
+_credentials_lock = threading.Lock()
+_thread_services = threading.local()
+
+
+def gmail_cache_key(refresh_token: str) -> str:
+    """Cache key for a refresh token; the token itself is never used as a key"""
+    return hashlib.sha256(refresh_token.encode('utf-8')).hexdigest()
+
+
+def _get_credentials_cache() -> TTLCache:
+    global _credentials_cache
+    with _credentials_lock:
+        if _credentials_cache is None:
+            _credentials_cache = TTLCache(maxsize=current_app.config.get('GMAIL_CREDENTIALS_CACHE_MAXSIZE', 256),
+                                          ttl=current_app.config.get('GMAIL_CREDENTIALS_CACHE_TTL', 24 * 3600))
+        return _credentials_cache
+
+
+def _get_thread_services() -> TTLCache:
+    services = getattr(_thread_services, 'cache', None)
+    if services is None:
+        services = TTLCache(maxsize=current_app.config.get('GMAIL_CREDENTIALS_CACHE_MAXSIZE', 256),
+                            ttl=current_app.config.get('GMAIL_CREDENTIALS_CACHE_TTL', 24 * 3600))
+        _thread_services.cache = services
+    return services
+
+
+def invalidate_gmail_credentials(refresh_token: str):
+    """Drop cached credentials (and with them every thread's service) for a refresh token"""
+    if _credentials_cache is not None:
+        _credentials_cache.delete(gmail_cache_key(refresh_token))
+
+
+def is_auth_error(error: Exception) -> bool:
+    """Whether an error means the cached credentials were revoked or rejected"""
+    if isinstance(error, RefreshError):
+        return True
+    return isinstance(error, HttpError) and error.resp.status == 401
 
 
 class GmailService:
-    def __init__(self):
+    def __init__(self, cleaning_options: Dict[str, Any] = None):
         self.client_id = os.getenv('GMAIL_CLIENT_ID')
         self.client_secret = os.getenv('GMAIL_CLIENT_SECRET')
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self._service_cache = {}  # Cache Gmail service instances
+        self.last_fetch_failures = {}  # Message id -> error from the last fetch_emails call
+        self.cleaner = get_email_cleaner(cleaning_options)  # From the agent's 'email_cleaning' config
     
     def get_access_token(self, refresh_token: str) -> str:
-        """Get a fresh access token using refresh token"""
-        try:
-            current_app.logger.info("Refreshing Gmail access token")
-            token_data = {
-                'client_id': self.client_id,
-                'client_secret': self.client_secret,
-                'refresh_token': refresh_token,
-                'grant_type': 'refresh_token'
-            }
-            
-            response = requests.post('https://oauth2.googleapis.com/token', data=token_data)
-            current_app.logger.info(f"Token refresh response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                current_app.logger.error(f"Token refresh failed with status {response.status_code}: {response.text}")
-                raise Exception(f"Token refresh failed with status {response.status_code}")
-            
-            token_json = response.json()
-            
-            if 'error' in token_json:
-                current_app.logger.error(f"Token refresh error: {token_json}")
-                raise Exception(f"Token refresh failed: {token_json['error']} - {token_json.get('error_description', '')}")
-            
-            if 'access_token' not in token_json:
-                current_app.logger.error(f"No access token in response: {token_json}")
-                raise Exception("No access token received from refresh request")
-            
-            current_app.logger.info("Access token refreshed successfully")
-            return token_json['access_token']
-            
-        except Exception as e:
-            current_app.logger.error(f"Error refreshing access token: {e}")
-            raise
+        """Get an access token for the refresh token, reusing the cached one until it nears expiry"""
+        return self.get_credentials(refresh_token).token
+    
+    def _credentials_entry(self, refresh_token: str) -> Tuple[Credentials, threading.Lock]:
+        """The shared (credentials, lock) for a refresh token, refreshed under the lock if expired"""
+        cache = _get_credentials_cache()
+        key = gmail_cache_key(refresh_token)
+        entry = cache.get(key)
+        if entry is None:
+            with _credentials_lock:
+                entry = cache.get(key)
+                if entry is None:
+                    credentials = Credentials(
+                        token=None,
+                        refresh_token=refresh_token,
+                        client_id=self.client_id,
+                        client_secret=self.client_secret,
+                        token_uri='https://oauth2.googleapis.com/token'
+                    )
+                    entry = (credentials, threading.Lock())
+                    cache.set(key, entry)
+
+        credentials, lock = entry
+        with lock:
+            if not credentials.valid:
+                current_app.logger.info("Gmail access token missing or near expiry, refreshing")
+                credentials.refresh(Request(session=get_requests_session()))
+        return entry
+
+    def get_credentials(self, refresh_token: str) -> Credentials:
+        """Get the shared credentials for a refresh token, refreshing them only when expired.
+
+        google-auth treats a token as invalid shortly before its expiry, so a
+        cached access token is never handed out just as it lapses.
+        """
+        return self._credentials_entry(refresh_token)[0]
     
     def build_gmail_service(self, refresh_token: str):
-        """Build Gmail API service with fresh credentials"""
+        """Get a Gmail API service for the refresh token.
+
+        Services are cached per thread (their httplib2 connection is not
+        thread-safe) and rebuilt whenever the shared credentials are replaced.
+        Each thread's service authorizes with its own copy of the credentials,
+        so a refresh by AuthorizedHttp never mutates the shared object; the
+        copy picks up the shared access token whenever it changes.
+        """
         try:
-            current_app.logger.info("Building Gmail service")
-            
-            # Create credentials with refresh token - let Google API client handle token refresh
+            shared, lock = self._credentials_entry(refresh_token)
+            with lock:
+                token, expiry = shared.token, shared.expiry
+
+            services = _get_thread_services()
+            key = gmail_cache_key(refresh_token)
+            cached = services.get(key)
+            if cached is not None and cached[0] is shared:
+                credentials, service = cached[1], cached[2]
+                if credentials.token != token:
+                    credentials.token, credentials.expiry = token, expiry
+                return service
+
             credentials = Credentials(
-                token=None,  # Let it refresh automatically
-                refresh_token=refresh_token,
-                client_id=self.client_id,
-                client_secret=self.client_secret,
-                token_uri='https://oauth2.googleapis.com/token'
+                token=token,
+                expiry=expiry,
+                refresh_token=shared.refresh_token,
+                client_id=shared.client_id,
+                client_secret=shared.client_secret,
+                token_uri=shared.token_uri
             )
-            
-            # Refresh the token if needed
-            if not credentials.valid:
-                current_app.logger.info("Credentials not valid, refreshing...")
-                credentials.refresh(Request())
-                current_app.logger.info("Credentials refreshed successfully")
-            
-            service = build('gmail', 'v1', credentials=credentials)
-            current_app.logger.info("Gmail service built successfully")
+            current_app.logger.info("Building Gmail service")
+            # The bundled discovery document avoids fetching it from Google on every build
+            service = build('gmail', 'v1', http=get_google_http(credentials),
+                            static_discovery=True, cache_discovery=False)
+            services.set(key, (shared, credentials, service))
             return service
             
         except Exception as e:
+            if is_auth_error(e):
+                invalidate_gmail_credentials(refresh_token)
             current_app.logger.error(f"Error building Gmail service: {e}")
             import traceback
             current_app.logger.error(f"Full traceback: {traceback.format_exc()}")
@@ -90,7 +169,8 @@ class GmailService:
         """Build Gmail search query based on criteria"""
         # Use Gmail's search operators to better match the UI semantics
         # Docs: https://support.google.com/mail/answer/7190
-        if criteria_type == 'last_24_hours':
+        if criteria_type in ('last_24_hours', 'since_last_sync'):
+            # since_last_sync falls back to the last day when a full resync is needed
             return 'in:inbox newer_than:1d'
         elif criteria_type == 'last_7_days':
             return 'in:inbox newer_than:7d'
@@ -101,11 +181,12 @@ class GmailService:
         else:
             return 'in:inbox'
     
-    def fetch_emails(self, refresh_token: str, criteria_type: str, count: int = 10) -> List[Dict[str, Any]]:
+    def fetch_emails(self, refresh_token: str, criteria_type: str, count: int = 10, service=None) -> List[Dict[str, Any]]:
         """Fetch emails from Gmail based on criteria"""
         try:
             current_app.logger.info(f"Fetching emails: criteria={criteria_type}, count={count}")
-            service = self.build_gmail_service(refresh_token)
+            if service is None:
+                service = self.build_gmail_service(refresh_token)
             query = self.get_query_for_criteria(criteria_type, count)
             current_app.logger.info(f"Using Gmail query: {query}")
             
@@ -139,7 +220,6 @@ class GmailService:
                     # Exponential backoff: 2^retry_count seconds
                     wait_time = 2 ** retry_count
                     current_app.logger.warning(f"Gmail API error, waiting {wait_time}s before retry {retry_count}: {list_error}")
-                    import time
                     time.sleep(wait_time)
             
             messages = results.get('messages', [])
@@ -149,48 +229,14 @@ class GmailService:
                 current_app.logger.info("No messages found matching criteria")
                 return []
             
-            # Fetch full message details
-            emails = []
-            for i, message in enumerate(messages):
-                try:
-                    current_app.logger.info(f"Fetching message {i+1}/{len(messages)}: {message['id']}")
-                    
-                    # Add retry logic for individual message fetching
-                    max_retries = 3
-                    retry_count = 0
-                    msg = None
-                    
-                    while retry_count < max_retries:
-                        try:
-                            msg = service.users().messages().get(
-                                userId='me',
-                                id=message['id'],
-                                format='full'
-                            ).execute()
-                            break
-                        except Exception as fetch_error:
-                            retry_count += 1
-                            if retry_count >= max_retries:
-                                raise fetch_error
-                            current_app.logger.warning(f"Retry {retry_count} for message {message['id']}: {fetch_error}")
-                            import time
-                            time.sleep(1)  # Wait 1 second before retry
-                    
-                    if msg:
-                        email_data = self.parse_email(msg)
-                        if email_data:
-                            emails.append(email_data)
-                        
-                except Exception as e:
-                    current_app.logger.error(f"Error fetching message {message['id']} after retries: {e}")
-                    # Don't fail completely, just skip this message
-                    continue
+            oldest_first = criteria_type == 'oldest_n'
+            message_ids, metadata_failures = self.select_messages(service, [m['id'] for m in messages], count,
+                                                                  oldest_first=oldest_first)
+            emails = self.load_emails(service, message_ids)
+            self.last_fetch_failures.update(metadata_failures)
             
             # Sort emails based on criteria
-            if criteria_type == 'oldest_n':
-                emails.sort(key=lambda x: x['timestamp'])
-            else:
-                emails.sort(key=lambda x: x['timestamp'], reverse=True)
+            emails.sort(key=lambda x: x['timestamp'], reverse=not oldest_first)
             
             return emails[:count]
             
@@ -198,6 +244,163 @@ class GmailService:
             current_app.logger.error(f"Error fetching emails: {e}")
             raise
     
+    def sync_emails(self, refresh_token: str, history_id: str = None, count: int = 10) -> Tuple[List[Dict[str, Any]], str]:
+        """Fetch inbox emails added since the given Gmail historyId.
+
+        Returns up to ``count`` new emails and the historyId to resume from
+        on the next run. New messages are taken oldest first, and when there
+        are more than ``count`` the returned historyId only moves past the
+        history records that were processed, so the rest are picked up by
+        the next sync instead of being skipped. Without a history id, or when
+        Gmail reports it as expired, this falls back to a full resync of the
+        last day.
+        """
+        current_app.logger.info(f"Syncing emails since historyId={history_id}, count={count}")
+        service = self.build_gmail_service(refresh_token)
+
+        if history_id:
+            try:
+                message_ids, latest_history_id = self.list_history(service, history_id, limit=count)
+                current_app.logger.info(f"Syncing {len(message_ids)} new messages since historyId={history_id}, "
+                                        f"resuming from {latest_history_id}")
+                emails = self.load_emails(service, message_ids)
+                emails.sort(key=lambda x: x['timestamp'], reverse=True)
+                return emails, latest_history_id
+            except HttpError as history_error:
+                if history_error.resp.status != 404:
+                    raise
+                current_app.logger.warning(f"historyId {history_id} expired, running a full resync")
+
+        # Read the mailbox history id before listing so nothing added meanwhile is missed
+        latest_history_id = service.users().getProfile(userId='me').execute().get('historyId')
+        emails = self.fetch_emails(refresh_token, 'since_last_sync', count, service=service)
+        return emails, latest_history_id
+    
+    def list_history(self, service, history_id: str, limit: int = None) -> Tuple[List[str], str]:
+        """List ids of messages added to the inbox since history_id, plus the historyId to resume from.
+
+        With a ``limit``, listing stops at the last whole history record that
+        fits (the first record is always taken) and the returned historyId is
+        that record's, so a later call continues with the remaining messages.
+        """
+        message_ids = {}
+        latest_history_id = history_id
+        page_token = None
+        while True:
+            params = {
+                'userId': 'me',
+                'startHistoryId': history_id,
+                'historyTypes': ['messageAdded', 'labelAdded'],
+                'labelId': 'INBOX'
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            response = service.users().history().list(**params).execute()
+
+            for record in response.get('history', []):
+                record_ids = [added['message']['id'] for added in record.get('messagesAdded', [])]
+                record_ids += [labeled['message']['id'] for labeled in record.get('labelsAdded', [])
+                               if 'INBOX' in labeled.get('labelIds', [])]
+                new_ids = [message_id for message_id in dict.fromkeys(record_ids) if message_id not in message_ids]
+                if limit is not None and message_ids and len(message_ids) + len(new_ids) > limit:
+                    return list(message_ids), latest_history_id
+                message_ids.update(dict.fromkeys(new_ids))
+                latest_history_id = record.get('id', latest_history_id)
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                # Everything was listed: resume from the mailbox's current history id
+                latest_history_id = response.get('historyId', latest_history_id)
+                break
+
+        return list(message_ids), latest_history_id
+    
+    def select_messages(self, service, message_ids: List[str], count: int,
+                        oldest_first: bool = False) -> Tuple[List[str], Dict[str, str]]:
+        """Pick the ``count`` newest (or oldest) of the candidate messages before fetching bodies.
+
+        When there are more candidates than needed, only their metadata
+        (From/Subject/Date headers and internalDate) is fetched to sort them,
+        so full bodies are downloaded just for the messages that are kept.
+        Returns the selected ids and any metadata fetch failures.
+        """
+        if len(message_ids) <= count:
+            return message_ids, {}
+        current_app.logger.info(f"Selecting {count} of {len(message_ids)} messages from metadata")
+        fetched, failures = self.fetch_messages(service, message_ids, message_format='metadata',
+                                                metadata_headers=METADATA_HEADERS)
+        for message_id, error in failures.items():
+            current_app.logger.error(f"Error fetching metadata for message {message_id} after retries: {error}")
+        ordered = sorted(fetched.values(), key=lambda msg: int(msg.get('internalDate', 0)), reverse=not oldest_first)
+        return [msg['id'] for msg in ordered[:count]], failures
+    
+    def load_emails(self, service, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch and parse full messages, logging any that could not be fetched"""
+        fetched, failures = self.fetch_messages(service, message_ids)
+        self.last_fetch_failures = failures
+        for message_id, error in failures.items():
+            current_app.logger.error(f"Error fetching message {message_id} after retries: {error}")
+
+        emails = []
+        for message_id in message_ids:
+            msg = fetched.get(message_id)
+            if msg:
+                email_data = self.parse_email(msg)
+                if email_data:
+                    emails.append(email_data)
+        return emails
+    
+    def fetch_messages(self, service, message_ids: List[str], message_format: str = 'full',
+                       metadata_headers: List[str] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """Fetch messages through the Gmail batch endpoint.
+
+        Returns a (messages, failures) pair keyed by message id. Messages that
+        fail are retried in a follow-up batch, up to three attempts in total,
+        before being reported in ``failures``. With ``message_format='metadata'``,
+        ``metadata_headers`` limits the headers returned.
+        """
+        batch_size = current_app.config.get('GMAIL_BATCH_SIZE', 50)
+        max_retries = 3
+        fetched = {}
+        failures = {}
+        pending = list(dict.fromkeys(message_ids))
+        options = {'metadataHeaders': metadata_headers} if metadata_headers else {}
+
+        for attempt in range(1, max_retries + 1):
+            failures = {}
+
+            def on_response(request_id, response, exception):
+                if exception is not None:
+                    failures[request_id] = exception
+                else:
+                    fetched[request_id] = response
+
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                current_app.logger.info(f"Fetching {len(chunk)} messages in one batch (attempt {attempt})")
+                batch = service.new_batch_http_request(callback=on_response)
+                for message_id in chunk:
+                    batch.add(
+                        service.users().messages().get(userId='me', id=message_id, format=message_format, **options),
+                        request_id=message_id
+                    )
+                try:
+                    batch.execute()
+                except Exception as batch_error:
+                    # The whole round trip failed; every unanswered message is retried
+                    for message_id in chunk:
+                        if message_id not in fetched:
+                            failures.setdefault(message_id, batch_error)
+
+            if not failures:
+                break
+            pending = list(failures)
+            if attempt < max_retries:
+                current_app.logger.warning(f"Retry {attempt} for {len(pending)} failed messages")
+                time.sleep(1)  # Wait 1 second before retry
+
+        return fetched, {message_id: str(error) for message_id, error in failures.items()}
+    
     def parse_email(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Parse Gmail message into structured data"""
         try:
@@ -241,121 +444,171 @@ class GmailService:
             return None
     
     def extract_body(self, payload: Dict[str, Any]) -> str:
-        """Extract email body from Gmail payload"""
-        body = ""
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body'].get('data', '')
-                    if data:
-                        body = base64.urlsafe_b64decode(data).decode('utf-8')
-                        break
-                elif part['mimeType'] == 'text/html' and not body:
-                    data = part['body'].get('data', '')
-                    if data:
-                        html_body = base64.urlsafe_b64decode(data).decode('utf-8')
-                        body = self.html_to_text(html_body)
-        else:
-            if payload['mimeType'] == 'text/plain':
-                data = payload['body'].get('data', '')
-                if data:
-                    body = base64.urlsafe_b64decode(data).decode('utf-8')
-            elif payload['mimeType'] == 'text/html':
-                data = payload['body'].get('data', '')
-                if data:
-                    html_body = base64.urlsafe_b64decode(data).decode('utf-8')
-                    body = self.html_to_text(html_body)
-        
+        """Extract email body from Gmail payload, preferring text/plain over text/html"""
+        part = select_body_part(payload)
+        if part is None:
+            return ""
+        body = decode_part(part)
+        if part['mimeType'].lower() == 'text/html':
+            body = self.html_to_text(body)
         return self.clean_email_body(body)
     
     def html_to_text(self, html: str) -> str:
-        """Convert HTML to plain text"""
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
-            return soup.get_text()
-        except ImportError:
-            # Fallback: simple regex-based HTML removal
-            clean = re.compile('<.*?>')
-            return re.sub(clean, '', html)
+        """Convert HTML to plain text, keeping only as much as the cleaner will look at"""
+        return html_to_text(html, limit=self.cleaner.scan_chars,
+                            backend=current_app.config.get('HTML_EXTRACTOR', 'auto'))
     
     def clean_email_body(self, body: str) -> str:
         """Clean email body by removing signatures, footers, etc."""
-        if not body:
-            return ""
-        
-        # Remove common signature patterns
-        signature_patterns = [
-            r'\n--\s*\n.*',  # Standard signature delimiter
-            r'\nBest regards.*',
-            r'\nSincerely.*',
-            r'\nThanks.*\n.*@.*',
-            r'\nSent from my.*',
-            r'\n\[.*\].*',  # Email client footers
-        ]
-        
-        cleaned = body
-        for pattern in signature_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Remove excessive whitespace
-        cleaned = re.sub(r'\n\s*\n', '\n\n', cleaned)
-        cleaned = cleaned.strip()
-        
-        # Limit length for summarization
-        if len(cleaned) > 2000:
-            cleaned = cleaned[:2000] + "..."
-        
-        return cleaned
+        return self.cleaner.clean(body)
     
-    def summarize_with_openai(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Summarize emails using OpenAI API"""
+    def summarize_with_openai(self, emails: List[Dict[str, Any]], agent_id: str = None,
+                              progress: Callable = None, on_summary: Callable = None) -> List[Dict[str, Any]]:
+        """Summarize emails using OpenAI API
+
+        Results keep the order of the groups. ``progress`` is called as
+        ``progress('summarizing', completed, total)`` and
+        ``on_summary(position, summary, total)`` with each summary as its
+        group finishes. See iter_summaries for concurrency and caching.
+        """
         try:
             summaries = []
-            
-            # Group emails by topic/sender for better summarization
-            grouped_emails = self.group_emails_by_topic(emails)
-            
-            for group in grouped_emails:
-                try:
-                    if len(group) == 1:
-                        # Single email summary
-                        email = group[0]
-                        summary_text = self.summarize_single_email(email)
-                    else:
-                        # Multiple emails on same topic
-                        summary_text = self.summarize_email_group(group)
-                        email = group[0]  # Use first email for metadata
-                    
-                    summaries.append({
-                        'id': email['id'],
-                        'sender': email['sender'],
-                        'subject': email['subject'],
-                        'date': email['date'],
-                        'summary': summary_text,
-                        'email_count': len(group)
-                    })
-                    
-                except Exception as e:
-                    current_app.logger.error(f"Error summarizing email group: {e}")
-                    # Add fallback summary
-                    email = group[0]
-                    summaries.append({
-                        'id': email['id'],
-                        'sender': email['sender'],
-                        'subject': email['subject'],
-                        'date': email['date'],
-                        'summary': f"Email from {email['sender']} about {email['subject']}",
-                        'email_count': len(group)
-                    })
-            
+            completed = 0
+            for position, summary, total in self.iter_summaries(emails, agent_id=agent_id):
+                if not summaries:
+                    summaries = [None] * total
+                summaries[position] = summary
+                completed += 1
+                if on_summary:
+                    on_summary(position, summary, total)
+                if progress:
+                    progress('summarizing', completed, total)
             return summaries
             
         except Exception as e:
             current_app.logger.error(f"Error in OpenAI summarization: {e}")
             raise
     
+    def iter_summaries(self, emails: List[Dict[str, Any]], agent_id: str = None) -> Iterator[Tuple[int, Dict[str, Any], int]]:
+        """Yield (position, summary, total) for each email group as soon as it is ready.
+
+        Groups are summarized concurrently, at most OPENAI_SUMMARY_CONCURRENCY
+        at a time, so summaries arrive in completion order; ``position`` is the
+        group's index in the original order. When an agent_id is given, groups
+        already summarized for that agent come from the summary cache first and
+        only the rest are sent to OpenAI.
+        """
+        # Group emails by topic/sender for better summarization
+        grouped_emails = self.group_emails_by_topic(emails)
+        total = len(grouped_emails)
+        if not grouped_emails:
+            return
+
+        keys = [summary_cache_key(group) for group in grouped_emails]
+        cache = get_summary_cache() if agent_id else None
+        cached = {}
+        if cache:
+            try:
+                cached = cache.get_many(agent_id, keys)
+            except Exception as cache_error:
+                current_app.logger.warning(f"Summary cache lookup failed: {cache_error}")
+            current_app.logger.info(f"Summary cache: {len(cached)} of {total} groups cached")
+
+        pending = []
+        for position, key in enumerate(keys):
+            if key in cached:
+                yield position, cached[key], total
+            else:
+                pending.append(position)
+
+        new_entries = {}
+        try:
+            for i, (summary, from_model) in self.iter_group_summaries([grouped_emails[p] for p in pending]):
+                position = pending[i]
+                if from_model:
+                    new_entries[keys[position]] = summary
+                yield position, summary, total
+        finally:
+            if cache and new_entries:
+                try:
+                    cache.set_many(agent_id, new_entries)
+                except Exception as cache_error:
+                    current_app.logger.warning(f"Summary cache update failed: {cache_error}")
+    
+    def iter_group_summaries(self, groups: List[List[Dict[str, Any]]]) -> Iterator[Tuple[int, Tuple[Dict[str, Any], bool]]]:
+        """Summarize groups concurrently, yielding (index, (summary, from_model)) in completion order"""
+        if not groups:
+            return
+
+        concurrency = max(1, min(current_app.config.get('OPENAI_SUMMARY_CONCURRENCY', 5), len(groups)))
+        if concurrency == 1:
+            for i, group in enumerate(groups):
+                yield i, self.summarize_group(group)
+            return
+
+        app = current_app._get_current_object()
+
+        def run(group):
+            with app.app_context():
+                return self.summarize_group(group)
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {executor.submit(run, group): i for i, group in enumerate(groups)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Stop queued work if the consumer goes away (e.g. a closed stream)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def summarize_group(self, group: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """Summarize one group of emails.
+
+        Returns the summary and whether it came from the model; on error the
+        summary holds a plain fallback description instead.
+        """
+        email = group[0]  # Use first email for metadata
+        from_model = True
+        try:
+            if len(group) == 1:
+                # Single email summary
+                summary_text = self.summarize_single_email(email, fallback_on_error=False)
+            else:
+                # Multiple emails on same topic
+                summary_text = self.summarize_email_group(group, fallback_on_error=False)
+        except Exception as e:
+            current_app.logger.error(f"Error summarizing email group: {e}")
+            summary_text = self.fallback_summary(group)
+            from_model = False
+
+        return {
+            'id': email['id'],
+            'sender': email['sender'],
+            'subject': email['subject'],
+            'date': email['date'],
+            'summary': summary_text,
+            'email_count': len(group)
+        }, from_model
+    
+    def fallback_summary(self, group: List[Dict[str, Any]]) -> str:
+        """Plain description used when a group cannot be summarized"""
+        if len(group) == 1:
+            return f"Email from {group[0]['sender']} regarding {group[0]['subject']}"
+        return f"Email thread with {len(group)} messages about {group[0]['subject']}"
+    
+    def get_openai_client(self) -> openai.OpenAI:
+        """Get the shared OpenAI client for this API key"""
+        with _openai_clients_lock:
+            client = _openai_clients.get(self.openai_api_key)
+            if client is None:
+                client = openai.OpenAI(
+                    api_key=self.openai_api_key,
+                    timeout=current_app.config.get('OPENAI_REQUEST_TIMEOUT', 30),
+                    max_retries=current_app.config.get('OPENAI_MAX_RETRIES', 2)
+                )
+                _openai_clients[self.openai_api_key] = client
+            return client
+    
     def group_emails_by_topic(self, emails: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
         """Group emails by similar topics/senders"""
         # Simple grouping by sender and subject similarity
@@ -392,14 +645,16 @@ class GmailService:
         
         return clean1 == clean2
     
-    def summarize_single_email(self, email: Dict[str, Any]) -> str:
+    def summarize_single_email(self, email: Dict[str, Any], fallback_on_error: bool = True) -> str:
         """Summarize a single email using OpenAI"""
         try:
             current_app.logger.info(f"Summarizing single email from {email['sender']}")
             
             if not self.openai_api_key:
                 current_app.logger.error("OpenAI API key not configured")
-                return f"Email from {email['sender']} regarding {email['subject']}"
+                if not fallback_on_error:
+                    raise ValueError("OpenAI API key not configured")
+                return self.fallback_summary([email])
             
             prompt = f"""
             Please summarize this email in 1-3 concise sentences. Focus on the main purpose and any action items.
@@ -413,7 +668,7 @@ class GmailService:
             Summary:
             """
 
-            client = openai.OpenAI(api_key=self.openai_api_key)
+            client = self.get_openai_client()
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -421,7 +676,8 @@ class GmailService:
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=150,
-                temperature=0.3
+                temperature=0.3,
+                timeout=current_app.config.get('OPENAI_REQUEST_TIMEOUT', 30)
             )
 
             summary = response.choices[0].message.content.strip()
@@ -430,9 +686,11 @@ class GmailService:
 
         except Exception as e:
             current_app.logger.error(f"Error in single email summarization: {e}")
-            return f"Email from {email['sender']} regarding {email['subject']}"
+            if not fallback_on_error:
+                raise
+            return self.fallback_summary([email])
     
-    def summarize_email_group(self, emails: List[Dict[str, Any]]) -> str:
+    def summarize_email_group(self, emails: List[Dict[str, Any]], fallback_on_error: bool = True) -> str:
         """Summarize a group of related emails"""
         try:
             email_contents = []
@@ -450,7 +708,7 @@ class GmailService:
             Summary:
             """
 
-            client = openai.OpenAI(api_key=self.openai_api_key)
+            client = self.get_openai_client()
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -458,7 +716,8 @@ class GmailService:
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=200,
-                temperature=0.3
+                temperature=0.3,
+                timeout=current_app.config.get('OPENAI_REQUEST_TIMEOUT', 30)
             )
 
             summary = response.choices[0].message.content.strip()
@@ -469,14 +728,29 @@ class GmailService:
 
         except Exception as e:
             current_app.logger.error(f"Error in group email summarization: {e}")
-            return f"Email thread with {len(emails)} messages about {emails[0]['subject']}"
+            if not fallback_on_error:
+                raise
+            return self.fallback_summary(emails)
+
 
+def fetch_and_summarize_emails(refresh_token: str, criteria_type: str, count: int = 10, agent_id: str = None,
+                               history_id: str = None, progress: Callable = None,
+                               cleaning_options: Dict[str, Any] = None,
+                               on_summary: Callable = None) -> List[Dict[str, Any]]:
+    """Main function to fetch and summarize emails
 
-def fetch_and_summarize_emails(refresh_token: str, criteria_type: str, count: int = 10) -> List[Dict[str, Any]]:
-    """Main function to fetch and summarize emails"""
+    Pass the agent_id to reuse summaries cached for that agent's earlier runs.
+    For the 'since_last_sync' criteria, history_id is the agent's stored Gmail
+    historyId; the new one is saved to the agent config once summarization
+    succeeds. ``progress(stage, completed=None, total=None)`` is called as the
+    run moves through fetching and summarizing, and ``on_summary`` with each
+    summary as it is ready (see GmailService.summarize_with_openai).
+    ``cleaning_options`` is the agent's 'email_cleaning' config (see
+    email_parsing.get_email_cleaner).
+    """
     try:
         current_app.logger.info(f"Starting email fetch and summarization process")
-        gmail_service = GmailService()
+        gmail_service = GmailService(cleaning_options)
         
         # Validate inputs
         if not refresh_token:
@@ -489,16 +763,23 @@ def fetch_and_summarize_emails(refresh_token: str, criteria_type: str, count: in
         current_app.logger.info(f"Fetching emails with criteria: {criteria_type}, count: {count}")
         
         # Fetch emails
-        emails = gmail_service.fetch_emails(refresh_token, criteria_type, count)
+        if progress:
+            progress('fetching')
+        emails, new_history_id = fetch_emails_for_criteria(gmail_service, refresh_token, criteria_type, count,
+                                                           agent_id=agent_id, history_id=history_id)
         
         if not emails:
             current_app.logger.info("No emails found to summarize")
-            return []
-        
-        current_app.logger.info(f"Found {len(emails)} emails, starting summarization")
+            summaries = []
+        else:
+            current_app.logger.info(f"Found {len(emails)} emails, starting summarization")
+            
+            # Summarize emails
+            summaries = gmail_service.summarize_with_openai(emails, agent_id=agent_id, progress=progress,
+                                                            on_summary=on_summary)
         
-        # Summarize emails
-        summaries = gmail_service.summarize_with_openai(emails)
+        if new_history_id and new_history_id != history_id:
+            save_history_id(agent_id, new_history_id)
         
         current_app.logger.info(f"Successfully created {len(summaries)} summaries")
         return summaries
@@ -508,3 +789,33 @@ def fetch_and_summarize_emails(refresh_token: str, criteria_type: str, count: in
         import traceback
         current_app.logger.error(f"Full traceback: {traceback.format_exc()}")
         raise
+
+
+def fetch_emails_for_criteria(gmail_service: GmailService, refresh_token: str, criteria_type: str, count: int,
+                              agent_id: str = None, history_id: str = None) -> Tuple[List[Dict[str, Any]], str]:
+    """Fetch emails for a criteria type, returning the emails and, for incremental sync, the new historyId"""
+    if criteria_type == 'since_last_sync' and not agent_id:
+        raise ValueError("Agent id is required for incremental sync")
+    try:
+        if criteria_type == 'since_last_sync':
+            return gmail_service.sync_emails(refresh_token, history_id, count)
+        return gmail_service.fetch_emails(refresh_token, criteria_type, count), None
+    except Exception as e:
+        if is_auth_error(e):
+            invalidate_gmail_credentials(refresh_token)
+        raise
+
+
+def save_history_id(agent_id: str, history_id: str):
+    """Store the Gmail historyId to resume incremental sync from in the agent config"""
+    supabase = get_service_supabase()
+    agent_resp = supabase.table('agents').select('config').eq('id', agent_id).execute()
+    if not agent_resp.data:
+        return
+    config = agent_resp.data[0].get('config') or {}
+    config['gmail_history_id'] = str(history_id)
+    supabase.table('agents').update({
+        'config': config,
+        'updated_at': datetime.utcnow().isoformat()
+    }).eq('id', agent_id).execute()
+    current_app.logger.info(f"Saved Gmail historyId {history_id} for agent {agent_id}")
@@ -0,0 +1,267 @@
+"""
+Background jobs for long-running work (email summarization) so web workers stay free
+"""
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from flask import Flask, current_app
+from agentsdr.core.cache import TTLCache
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+
+class MemoryJobStore:
+    """Process-local job state, expired after a TTL"""
+
+    def __init__(self, ttl: float):
+        self._jobs = TTLCache(maxsize=10000, ttl=ttl)
+        self._events = TTLCache(maxsize=10000, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def save(self, job: Dict[str, Any]):
+        self._jobs.set(job['id'], dict(job))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+                self._jobs.set(job_id, job)
+
+    def publish(self, job_id: str, event: str, data: Any):
+        with self._lock:
+            events = self._events.get(job_id) or []
+            events.append({'event': event, 'data': data})
+            self._events.set(job_id, events)
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list((self._events.get(job_id) or [])[start:])
+
+
+class RedisJobStore:
+    """Job state in Redis, so any web worker can answer progress polls"""
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("JOB_STORE_BACKEND=redis requires the 'redis' package")
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+
+    def _key(self, job_id: str) -> str:
+        return f"agentsdr:job:{job_id}"
+
+    def save(self, job: Dict[str, Any]):
+        self._redis.set(self._key(job['id']), json.dumps(job, default=str), ex=self.ttl)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._redis.get(self._key(job_id))
+        return json.loads(raw) if raw else None
+
+    def update(self, job_id: str, **fields):
+        job = self.get(job_id)
+        if job:
+            job.update(fields)
+            self.save(job)
+
+    def publish(self, job_id: str, event: str, data: Any):
+        key = f"{self._key(job_id)}:events"
+        pipe = self._redis.pipeline()
+        pipe.rpush(key, json.dumps({'event': event, 'data': data}, default=str))
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        return [json.loads(raw) for raw in self._redis.lrange(f"{self._key(job_id)}:events", start, -1)]
+
+
+class SqliteJobStore:
+    """Job state in a SQLite file, shared by every worker process on the host.
+
+    Each operation opens its own connection, so the store is safe to use
+    from request threads and job threads alike.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS jobs '
+                       '(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)')
+            db.execute('CREATE TABLE IF NOT EXISTS job_events (seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+                       'job_id TEXT NOT NULL, data TEXT NOT NULL, expires_at REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, seq)')
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit (isolation_level=None); update() opens its own write transaction
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def save(self, job: Dict[str, Any]):
+        now = time.time()
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO jobs (id, data, expires_at) VALUES (?, ?, ?)',
+                       (job['id'], json.dumps(job, default=str), now + self.ttl))
+            # Opportunistic eviction keeps the file bounded without a scheduler
+            db.execute('DELETE FROM jobs WHERE expires_at < ?', (now,))
+            db.execute('DELETE FROM job_events WHERE expires_at < ?', (now,))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as db:
+            row = db.execute('SELECT data FROM jobs WHERE id = ? AND expires_at >= ?',
+                             (job_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id: str, **fields):
+        with self._connect() as db:
+            # Take the write lock before reading so concurrent updates are not lost
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute('SELECT data FROM jobs WHERE id = ?', (job_id,)).fetchone()
+                if row:
+                    job = json.loads(row[0])
+                    job.update(fields)
+                    db.execute('UPDATE jobs SET data = ? WHERE id = ?', (json.dumps(job, default=str), job_id))
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+
+    def publish(self, job_id: str, event: str, data: Any):
+        with self._connect() as db:
+            db.execute('INSERT INTO job_events (job_id, data, expires_at) VALUES (?, ?, ?)',
+                       (job_id, json.dumps({'event': event, 'data': data}, default=str), time.time() + self.ttl))
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        with self._connect() as db:
+            rows = db.execute('SELECT data FROM job_events WHERE job_id = ? ORDER BY seq LIMIT -1 OFFSET ?',
+                              (job_id, start)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class JobProgress:
+    """Passed to job functions as ``progress``.
+
+    Call it as ``progress(stage, completed=None, total=None)`` to report
+    where the job is, and use ``publish(event, data)`` to append an event
+    that clients can follow while the job runs (see JobQueue.events).
+    """
+
+    def __init__(self, store, job_id: str):
+        self.store = store
+        self.job_id = job_id
+
+    def __call__(self, stage: str, completed: int = None, total: int = None):
+        self.store.update(self.job_id,
+                          progress={'stage': stage, 'completed': completed, 'total': total},
+                          updated_at=datetime.utcnow().isoformat())
+
+    def publish(self, event: str, data: Any):
+        self.store.publish(self.job_id, event, data)
+
+
+class JobQueue:
+    """In-process worker pool that runs jobs inside an application context"""
+
+    def __init__(self, app: Flask, store):
+        self.app = app
+        self.store = store
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('JOB_WORKERS', 4),
+            thread_name_prefix='agentsdr-job'
+        )
+
+    def enqueue(self, kind: str, fn: Callable, *args, owner_id: str = None, **metadata) -> Dict[str, Any]:
+        """Queue ``fn(progress, *args)`` and return the job record.
+
+        ``progress`` is a JobProgress for reporting stages and publishing
+        events; the return value of ``fn`` becomes the job result.
+        """
+        now = datetime.utcnow().isoformat()
+        job = {
+            'id': str(uuid.uuid4()),
+            'kind': kind,
+            'owner_id': owner_id,
+            'status': JOB_QUEUED,
+            'progress': {'stage': 'queued', 'completed': 0, 'total': None},
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now,
+            **metadata
+        }
+        self.store.save(job)
+        self._executor.submit(self._run, job['id'], fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        """Events the job has published, from index ``start`` on"""
+        return self.store.events(job_id, start)
+
+    def _run(self, job_id: str, fn: Callable, args: tuple):
+        with self.app.app_context():
+            progress = JobProgress(self.store, job_id)
+            self.store.update(job_id, status=JOB_RUNNING, updated_at=datetime.utcnow().isoformat())
+            try:
+                result = fn(progress, *args)
+                self.store.update(job_id, status=JOB_SUCCEEDED, result=result,
+                                  progress={'stage': 'done', 'completed': None, 'total': None},
+                                  updated_at=datetime.utcnow().isoformat())
+            except Exception as e:
+                current_app.logger.error(f"Job {job_id} failed: {e}")
+                current_app.logger.error(f"Full traceback: {traceback.format_exc()}")
+                self.store.update(job_id, status=JOB_FAILED, error=str(e),
+                                  updated_at=datetime.utcnow().isoformat())
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue, creating it on first use.
+
+    Jobs run in this process, but their state lives in the store selected by
+    JOB_STORE_BACKEND: 'sqlite' (shared by the workers on one host), 'redis'
+    (shared across hosts) or 'memory' (this process only, for tests).
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            app = current_app._get_current_object()
+            ttl = app.config.get('JOB_TTL', 3600)
+            backend = app.config.get('JOB_STORE_BACKEND', 'sqlite')
+            if backend == 'redis':
+                store = RedisJobStore(app.config['REDIS_URL'], ttl)
+            elif backend == 'sqlite':
+                store = SqliteJobStore(app.config['JOB_STORE_PATH'], ttl)
+            elif backend == 'memory':
+                store = MemoryJobStore(ttl)
+            else:
+                raise ValueError(f"Unknown job store backend: {backend}")
+            _queue = JobQueue(app, store)
+        return _queue
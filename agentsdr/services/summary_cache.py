@@ -0,0 +1,93 @@
+"""
+Per-agent cache of email summaries, so repeated runs only send new mail to OpenAI
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+from flask import current_app
+from agentsdr.core.cache import TTLCache
+from agentsdr.core.supabase_client import get_service_supabase
+
+# Bump whenever the summarization prompts change so stale summaries are not reused
+PROMPT_VERSION = '1'
+
+
+def summary_cache_key(group: List[Dict[str, Any]]) -> str:
+    """Build the cache key for a group of emails.
+
+    The key covers every message id in the group, a hash of each message's
+    content and the prompt version, so edited threads or new prompts miss.
+    """
+    parts = [PROMPT_VERSION]
+    for email in group:
+        content = '\x00'.join([email.get('sender', ''), email.get('subject', ''), email.get('body', '')])
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        parts.append(f"{email['id']}:{content_hash}")
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+class MemorySummaryCache:
+    """Process-local summary cache"""
+
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_many(self, agent_id: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for key in keys:
+            summary = self._cache.get((agent_id, key))
+            if summary is not None:
+                found[key] = dict(summary)
+        return found
+
+    def set_many(self, agent_id: str, entries: Dict[str, Dict[str, Any]]):
+        for key, summary in entries.items():
+            self._cache.set((agent_id, key), dict(summary))
+
+
+class SupabaseSummaryCache:
+    """Summary cache persisted in the email_summary_cache table, shared by all workers"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    def get_many(self, agent_id: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+        cutoff = (datetime.utcnow() - timedelta(seconds=self.ttl)).isoformat()
+        supabase = get_service_supabase()
+        response = supabase.table('email_summary_cache').select('cache_key, summary') \
+            .eq('agent_id', agent_id).in_('cache_key', keys).gte('created_at', cutoff).execute()
+        return {row['cache_key']: row['summary'] for row in response.data or []}
+
+    def set_many(self, agent_id: str, entries: Dict[str, Dict[str, Any]]):
+        if not entries:
+            return
+        now = datetime.utcnow().isoformat()
+        rows = [{
+            'agent_id': agent_id,
+            'cache_key': key,
+            'summary': summary,
+            'created_at': now
+        } for key, summary in entries.items()]
+        supabase = get_service_supabase()
+        supabase.table('email_summary_cache').upsert(rows, on_conflict='agent_id,cache_key').execute()
+
+
+_caches = {}
+
+
+def get_summary_cache() -> Optional[Any]:
+    """Get the summary cache selected by SUMMARY_CACHE_BACKEND ('memory', 'supabase' or 'none')"""
+    backend = current_app.config.get('SUMMARY_CACHE_BACKEND', 'memory')
+    if backend == 'none':
+        return None
+    if backend not in _caches:
+        ttl = current_app.config.get('SUMMARY_CACHE_TTL', 7 * 24 * 3600)
+        if backend == 'memory':
+            _caches[backend] = MemorySummaryCache(ttl)
+        elif backend == 'supabase':
+            _caches[backend] = SupabaseSummaryCache(ttl)
+        else:
+            raise ValueError(f"Unknown summary cache backend: {backend}")
+    return _caches[backend]
@@ -0,0 +1,102 @@
+"""
+Server-side storage for email summary runs, shared by every member of the organization
+"""
+import threading
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+from flask import current_app
+from agentsdr.core.cache import TTLCache
+from agentsdr.core.supabase_client import get_service_supabase
+
+
+def new_summary_run(org_id: str, agent_id: str, created_by: str, criteria_type: str, count: int,
+                    summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a summary run record"""
+    return {
+        'id': str(uuid.uuid4()),
+        'org_id': org_id,
+        'agent_id': agent_id,
+        'created_by': created_by,
+        'criteria_type': criteria_type,
+        'count': count,
+        'summaries': summaries,
+        'created_at': datetime.utcnow().isoformat()
+    }
+
+
+class MemorySummaryRunStore:
+    """Process-local run store with TTL eviction"""
+
+    def __init__(self, ttl: float, maxsize: int = 1000, runs_per_agent: int = 50):
+        self._runs = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._agent_runs = defaultdict(lambda: deque(maxlen=runs_per_agent))
+        self._lock = threading.Lock()
+
+    def save_run(self, run: Dict[str, Any]):
+        self._runs.set(run['id'], run)
+        with self._lock:
+            self._agent_runs[run['agent_id']].appendleft(run['id'])
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        return self._runs.get(run_id)
+
+    def list_runs(self, agent_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            run_ids = list(self._agent_runs.get(agent_id, []))
+        runs = []
+        for run_id in run_ids:
+            run = self._runs.get(run_id)
+            if run:
+                runs.append({k: v for k, v in run.items() if k != 'summaries'})
+            if len(runs) >= limit:
+                break
+        return runs
+
+
+class SupabaseSummaryRunStore:
+    """Run store backed by the summary_runs table"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    def save_run(self, run: Dict[str, Any]):
+        now = datetime.utcnow()
+        row = dict(run)
+        row['expires_at'] = (now + timedelta(seconds=self.ttl)).isoformat()
+        supabase = get_service_supabase()
+        supabase.table('summary_runs').insert(row).execute()
+        # Opportunistic eviction keeps the table bounded without a scheduler
+        supabase.table('summary_runs').delete().lt('expires_at', now.isoformat()).execute()
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        supabase = get_service_supabase()
+        response = supabase.table('summary_runs').select('*').eq('id', run_id) \
+            .gt('expires_at', datetime.utcnow().isoformat()).limit(1).execute()
+        return response.data[0] if response.data else None
+
+    def list_runs(self, agent_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        supabase = get_service_supabase()
+        response = supabase.table('summary_runs') \
+            .select('id, org_id, agent_id, created_by, criteria_type, count, created_at') \
+            .eq('agent_id', agent_id).gt('expires_at', datetime.utcnow().isoformat()) \
+            .order('created_at', desc=True).limit(limit).execute()
+        return response.data or []
+
+
+_stores = {}
+
+
+def get_summary_run_store():
+    """Get the run store selected by SUMMARY_RUN_BACKEND ('supabase' or 'memory')"""
+    backend = current_app.config.get('SUMMARY_RUN_BACKEND', 'supabase')
+    if backend not in _stores:
+        ttl = current_app.config.get('SUMMARY_RUN_TTL', 24 * 3600)
+        if backend == 'memory':
+            _stores[backend] = MemorySummaryRunStore(ttl)
+        elif backend == 'supabase':
+            _stores[backend] = SupabaseSummaryRunStore(ttl)
+        else:
+            raise ValueError(f"Unknown summary run backend: {backend}")
+    return _stores[backend]
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,6 +9,14 @@ class Config:
     SUPABASE_URL = os.environ.get('SUPABASE_URL')
     SUPABASE_ANON_KEY = os.environ.get('SUPABASE_ANON_KEY')
     SUPABASE_SERVICE_ROLE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+
+    # Outbound HTTP pools shared by Supabase and Google clients (see agentsdr/core/http.py)
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 20))
+    HTTP_POOL_KEEPALIVE = int(os.environ.get('HTTP_POOL_KEEPALIVE', 10))
+    HTTP_KEEPALIVE_EXPIRY = float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', 30))
+    HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 30))
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5))
+    HTTP2_ENABLED = os.environ.get('HTTP2_ENABLED', 'true').lower() == 'true'
     
     # Email settings for invitations
     SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
@@ -30,6 +39,49 @@ class Config:
     MAX_ORGS_PER_USER = 10
     MAX_MEMBERS_PER_ORG = 100
 
+    # Gmail settings
+    GMAIL_BATCH_SIZE = int(os.environ.get('GMAIL_BATCH_SIZE', 50))  # Gmail recommends <= 50 calls per batch
+    GMAIL_CREDENTIALS_CACHE_TTL = int(os.environ.get('GMAIL_CREDENTIALS_CACHE_TTL', 24 * 3600))
+    GMAIL_CREDENTIALS_CACHE_MAXSIZE = int(os.environ.get('GMAIL_CREDENTIALS_CACHE_MAXSIZE', 256))
+    # HTML-only bodies: 'auto' (selectolax, then lxml, then the standard library), or one backend by name
+    HTML_EXTRACTOR = os.environ.get('HTML_EXTRACTOR', 'auto')
+
+    # OpenAI summarization
+    OPENAI_SUMMARY_CONCURRENCY = int(os.environ.get('OPENAI_SUMMARY_CONCURRENCY', 5))
+    OPENAI_REQUEST_TIMEOUT = float(os.environ.get('OPENAI_REQUEST_TIMEOUT', 30))
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 2))
+
+    # Summary cache: 'memory' (per process), 'supabase' (email_summary_cache table) or 'none'
+    SUMMARY_CACHE_BACKEND = os.environ.get('SUMMARY_CACHE_BACKEND', 'memory')
+    SUMMARY_CACHE_TTL = int(os.environ.get('SUMMARY_CACHE_TTL', 7 * 24 * 3600))
+
+    # Summary runs: 'supabase' (summary_runs table, shared by all workers) or 'memory' (per process)
+    SUMMARY_RUN_BACKEND = os.environ.get('SUMMARY_RUN_BACKEND', 'supabase')
+    SUMMARY_RUN_TTL = int(os.environ.get('SUMMARY_RUN_TTL', 24 * 3600))
+    SUMMARIES_PER_PAGE = 20
+    SUMMARY_MAX_COUNT = int(os.environ.get('SUMMARY_MAX_COUNT', 100))  # Most emails one run may summarize
+    SUMMARY_STREAM_POLL_INTERVAL = float(os.environ.get('SUMMARY_STREAM_POLL_INTERVAL', 0.5))
+    SUMMARY_STREAM_TIMEOUT = float(os.environ.get('SUMMARY_STREAM_TIMEOUT', 90))  # Clients reconnect after this
+
+    # Background jobs: in-process worker pool; job state in 'sqlite' (shared by the
+    # workers on one host), 'redis' (shared across hosts) or 'memory' (one process)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+    JOB_STORE_BACKEND = os.environ.get('JOB_STORE_BACKEND', 'sqlite')
+    JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH', os.path.join(tempfile.gettempdir(), 'agentsdr-jobs.sqlite3'))
+    JOB_TTL = int(os.environ.get('JOB_TTL', 3600))
+    REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+    # Cross-request caches: 'memory' (per worker) or 'redis' (shared by all workers)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    ORG_CACHE_TTL = int(os.environ.get('ORG_CACHE_TTL', 300))
+    ORG_CACHE_MAXSIZE = int(os.environ.get('ORG_CACHE_MAXSIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    ORG_OVERVIEW_TTL = int(os.environ.get('ORG_OVERVIEW_TTL', 30))
+
+    # Keyset pagination for list views; ?limit= is capped at MAX_PAGE_SIZE
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 200))
+
 class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
@@ -41,6 +93,8 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     WTF_CSRF_ENABLED = False
+    SUMMARY_RUN_BACKEND = 'memory'
+    JOB_STORE_BACKEND = 'memory'
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for email body cleaning (agentsdr.services.email_parsing)
+
+Compares the compiled EmailCleaner pipeline with the previous per-call
+re.sub implementation. Point --corpus at a directory of saved newsletters
+(*.html, *.htm, *.eml or *.txt); without one a synthetic newsletter corpus
+is generated.
+
+    python scripts/bench_email_cleaning.py --corpus ~/newsletters --repeat 20
+"""
+
+import argparse
+import email
+import os
+import random
+import re
+import sys
+import timeit
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from agentsdr.services.email_parsing import EmailCleaner
+
+
+def legacy_clean(body):
+    """clean_email_body before the compiled pipeline"""
+    if not body:
+        return ""
+    signature_patterns = [
+        r'\n--\s*\n.*',
+        r'\nBest regards.*',
+        r'\nSincerely.*',
+        r'\nThanks.*\n.*@.*',
+        r'\nSent from my.*',
+        r'\n\[.*\].*',
+    ]
+    cleaned = body
+    for pattern in signature_patterns:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.DOTALL | re.IGNORECASE)
+    cleaned = re.sub(r'\n\s*\n', '\n\n', cleaned)
+    cleaned = cleaned.strip()
+    if len(cleaned) > 2000:
+        cleaned = cleaned[:2000] + "..."
+    return cleaned
+
+
+def html_text(html):
+    return BeautifulSoup(html, 'html.parser').get_text()
+
+
+def load_corpus(path):
+    """Plain-text bodies for every message in a directory"""
+    bodies = []
+    for name in sorted(os.listdir(path)):
+        full_path = os.path.join(path, name)
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in ('.html', '.htm', '.eml', '.txt'):
+            continue
+        with open(full_path, 'rb') as f:
+            raw = f.read()
+        if extension == '.eml':
+            message = email.message_from_bytes(raw)
+            for part in message.walk():
+                if part.get_content_type() in ('text/plain', 'text/html'):
+                    payload = part.get_payload(decode=True) or b''
+                    text = payload.decode(part.get_content_charset() or 'utf-8', errors='replace')
+                    bodies.append(html_text(text) if part.get_content_type() == 'text/html' else text)
+                    break
+        elif extension == '.txt':
+            bodies.append(raw.decode('utf-8', errors='replace'))
+        else:
+            bodies.append(html_text(raw.decode('utf-8', errors='replace')))
+    return bodies
+
+
+def synthetic_corpus(count, seed=7):
+    """Newsletter-shaped bodies: long article sections, link lists, footers and blank-line padding"""
+    rng = random.Random(seed)
+    words = ('growth pipeline quarterly update launch customer webinar pricing roadmap '
+             'report insights team product release partner feature offer').split()
+    bodies = []
+    for _ in range(count):
+        sections = []
+        for _ in range(rng.randint(10, 80)):
+            sentence = ' '.join(rng.choice(words) for _ in range(rng.randint(30, 120)))
+            sections.append(f"{sentence.capitalize()}.\n\n\n   \n[Read more] https://example.com/{rng.randint(1, 10**6)}")
+        footer = ("\n--\nThe Newsletter Team\nnews@example.com\n"
+                  "\nYou are receiving this because you subscribed. Unsubscribe | Preferences\n")
+        bodies.append('\n'.join(sections) + footer * rng.randint(1, 5))
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='directory of saved messages (*.html, *.htm, *.eml, *.txt)')
+    parser.add_argument('--count', type=int, default=200, help='synthetic messages when no corpus is given')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    bodies = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.count)
+    if not bodies:
+        print("No messages found")
+        sys.exit(1)
+    total_chars = sum(len(body) for body in bodies)
+    print(f"{len(bodies)} messages, {total_chars / len(bodies):,.0f} chars on average")
+
+    cleaner = EmailCleaner()
+    for name, clean in (('legacy re.sub', legacy_clean), ('EmailCleaner', cleaner.clean)):
+        seconds = min(timeit.repeat(lambda: [clean(body) for body in bodies], number=1, repeat=args.repeat))
+        print(f"{name:<14} {seconds * 1000:9.2f} ms per corpus  {seconds * 1e6 / len(bodies):9.1f} us per message")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML-to-text extractor backends (agentsdr.services.email_parsing)
+
+Times every installed backend, with and without the summarization cutoff,
+against the previous BeautifulSoup(html, 'html.parser').get_text() path.
+Point --corpus at a directory of saved *.html/*.htm payloads; without one
+synthetic newsletters are generated.
+
+    python scripts/bench_html_extraction.py --corpus ~/newsletters --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentsdr.services.email_parsing import (
+    DEFAULT_MAX_CHARS, HTML_EXTRACTORS, SCAN_FACTOR, extractor_available, html_to_text
+)
+
+
+def load_corpus(path):
+    payloads = []
+    for name in sorted(os.listdir(path)):
+        if os.path.splitext(name)[1].lower() in ('.html', '.htm'):
+            with open(os.path.join(path, name), 'rb') as f:
+                payloads.append(f.read().decode('utf-8', errors='replace'))
+    return payloads
+
+
+def synthetic_corpus(count, seed=7):
+    """Table-layout newsletters with inline styles, tracking scripts and long article lists"""
+    rng = random.Random(seed)
+    words = ('growth pipeline quarterly update launch customer webinar pricing roadmap '
+             'report insights team product release partner feature offer').split()
+    payloads = []
+    for _ in range(count):
+        rows = []
+        for _ in range(rng.randint(20, 150)):
+            sentence = ' '.join(rng.choice(words) for _ in range(rng.randint(20, 80)))
+            rows.append(
+                '<tr><td style="padding:12px;font-family:Arial,sans-serif;color:#333333">'
+                f'<h2 style="margin:0">{sentence[:40].title()}</h2><p>{sentence} &amp; more.</p>'
+                f'<a href="https://example.com/{rng.randint(1, 10**6)}?utm_source=newsletter">Read more</a>'
+                '</td></tr>'
+            )
+        payloads.append(
+            '<html><head><style>' + 'td { padding: 0; } ' * 200 + '</style></head><body>'
+            '<script>window.dataLayer = [];</script><table width="600">' + ''.join(rows) +
+            '</table><p>Unsubscribe | Preferences</p></body></html>'
+        )
+    return payloads
+
+
+def legacy_extract(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser').get_text()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='directory of saved HTML payloads (*.html, *.htm)')
+    parser.add_argument('--count', type=int, default=50, help='synthetic payloads when no corpus is given')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--limit', type=int, default=DEFAULT_MAX_CHARS * SCAN_FACTOR,
+                        help='text cutoff, as used when summarizing')
+    args = parser.parse_args()
+
+    payloads = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.count)
+    if not payloads:
+        print("No payloads found")
+        sys.exit(1)
+    print(f"{len(payloads)} payloads, {sum(map(len, payloads)) / len(payloads) / 1024:,.1f} KiB on average")
+
+    candidates = []
+    try:
+        import bs4  # noqa: F401
+        candidates.append(('beautifulsoup (previous)', legacy_extract))
+    except ImportError:
+        pass
+    for name in HTML_EXTRACTORS:
+        if not extractor_available(name):
+            print(f"{name:<26} not installed")
+            continue
+        candidates.append((name, lambda html, name=name: html_to_text(html, backend=name)))
+        candidates.append((f"{name} (limit {args.limit})",
+                           lambda html, name=name: html_to_text(html, limit=args.limit, backend=name)))
+
+    for label, extract in candidates:
+        seconds = min(timeit.repeat(lambda: [extract(html) for html in payloads], number=1, repeat=args.repeat))
+        print(f"{label:<26} {seconds * 1000:9.2f} ms per corpus  {seconds * 1000 / len(payloads):7.3f} ms per payload")
+
+
+if __name__ == '__main__':
+    main()
@@ -69,6 +69,33 @@ CREATE TABLE IF NOT EXISTS public.agents (
 CREATE INDEX IF NOT EXISTS idx_agents_org_id ON public.agents(org_id);
 CREATE INDEX IF NOT EXISTS idx_agents_created_by ON public.agents(created_by);
 
+-- Create email_summary_cache table (summaries reused across runs of an agent)
+CREATE TABLE IF NOT EXISTS public.email_summary_cache (
+    agent_id UUID NOT NULL REFERENCES public.agents(id) ON DELETE CASCADE,
+    cache_key TEXT NOT NULL,
+    summary JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (agent_id, cache_key)
+);
+CREATE INDEX IF NOT EXISTS idx_email_summary_cache_created_at ON public.email_summary_cache(created_at);
+ALTER TABLE public.email_summary_cache ENABLE ROW LEVEL SECURITY;
+
+-- Create summary_runs table (results of email summarization runs, shared within the org)
+CREATE TABLE IF NOT EXISTS public.summary_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    org_id UUID NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    agent_id UUID NOT NULL REFERENCES public.agents(id) ON DELETE CASCADE,
+    created_by UUID REFERENCES public.users(id) ON DELETE SET NULL,
+    criteria_type TEXT NOT NULL,
+    count INTEGER,
+    summaries JSONB NOT NULL DEFAULT '[]'::jsonb,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_summary_runs_agent_created ON public.summary_runs(agent_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_summary_runs_expires_at ON public.summary_runs(expires_at);
+ALTER TABLE public.summary_runs ENABLE ROW LEVEL SECURITY;
+
 
 
 -- Create indexes for better performance
@@ -85,6 +112,16 @@ CREATE INDEX IF NOT EXISTS idx_invitations_email ON public.invitations(email);
 CREATE INDEX IF NOT EXISTS idx_records_org_id ON public.records(org_id);
 CREATE INDEX IF NOT EXISTS idx_records_created_by ON public.records(created_by);
 
+-- Keyset pagination (agentsdr/core/pagination.py) orders by created_at DESC, id DESC
+-- and filters on (created_at, id) < cursor, per org or over the whole table;
+-- these indexes let each page be read without sorting the table.
+-- admin_organization_stats and admin_user_stats page over organizations and users.
+CREATE INDEX IF NOT EXISTS idx_records_org_created_id ON public.records(org_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_agents_org_created_id ON public.agents(org_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_invitations_org_created_id ON public.invitations(org_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_organizations_created_id ON public.organizations(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON public.users(created_at DESC, id DESC);
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE public.users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.organizations ENABLE ROW LEVEL SECURITY;
@@ -194,6 +231,12 @@ CREATE POLICY "Users can delete agents in their organizations" ON public.agents
         public.is_org_admin(org_id) OR public.is_super_admin()
     );
 
+-- Summary runs table policies
+CREATE POLICY "Users can view summary runs from their organizations" ON public.summary_runs
+    FOR SELECT USING (
+        public.is_org_member(org_id) OR public.is_super_admin()
+    );
+
         public.is_org_admin(org_id) OR public.is_super_admin()
     );
 
@@ -250,3 +293,182 @@ CREATE TRIGGER update_organizations_updated_at BEFORE UPDATE ON public.organizat
 
 CREATE TRIGGER update_records_updated_at BEFORE UPDATE ON public.records
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Computed column: records.excerpt lets list pages preview content without loading it all
+CREATE OR REPLACE FUNCTION public.excerpt(public.records)
+RETURNS TEXT AS $$
+    SELECT LEFT($1.content, 200);
+$$ LANGUAGE sql STABLE;
+
+-- Org overview: every counter and the recent records for an org in one round trip
+CREATE OR REPLACE FUNCTION public.org_overview(p_org_id UUID, p_recent_limit INT DEFAULT 10)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'members_count', (SELECT COUNT(*) FROM public.organization_members WHERE org_id = p_org_id),
+        'records_count', (SELECT COUNT(*) FROM public.records WHERE org_id = p_org_id),
+        'invites_count', (SELECT COUNT(*) FROM public.invitations WHERE org_id = p_org_id),
+        'agents_count', (SELECT COUNT(*) FROM public.agents WHERE org_id = p_org_id),
+        'recent_records', COALESCE((
+            SELECT json_agg(r ORDER BY r.created_at DESC)
+            FROM (
+                SELECT rec.id, rec.org_id, rec.title, rec.created_by, rec.created_at, rec.updated_at,
+                       public.excerpt(rec) AS excerpt
+                FROM public.records rec
+                WHERE rec.org_id = p_org_id
+                ORDER BY rec.created_at DESC
+                LIMIT p_recent_limit
+            ) r
+        ), '[]'::json)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Delete an organization and everything under it in one transaction.
+-- Child tables go through ON DELETE CASCADE; returns the row counts removed.
+CREATE OR REPLACE FUNCTION public.delete_organization(p_org_id UUID)
+RETURNS JSON AS $$
+DECLARE
+    deleted JSON;
+BEGIN
+    SELECT json_build_object(
+        'members', (SELECT COUNT(*) FROM public.organization_members WHERE org_id = p_org_id),
+        'invitations', (SELECT COUNT(*) FROM public.invitations WHERE org_id = p_org_id),
+        'records', (SELECT COUNT(*) FROM public.records WHERE org_id = p_org_id),
+        'agents', (SELECT COUNT(*) FROM public.agents WHERE org_id = p_org_id)
+    ) INTO deleted;
+
+    DELETE FROM public.organizations WHERE id = p_org_id;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Organization % not found', p_org_id;
+    END IF;
+
+    RETURN deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Functions are executable by PUBLIC by default; only the service role may call this one
+REVOKE EXECUTE ON FUNCTION public.delete_organization(UUID) FROM PUBLIC, anon, authenticated;
+
+-- Admin listings: rows joined with grouped counts so each list page is one query
+CREATE OR REPLACE VIEW public.admin_organization_stats AS
+SELECT o.*, COALESCE(m.member_count, 0) AS member_count
+FROM public.organizations o
+LEFT JOIN (
+    SELECT org_id, COUNT(*) AS member_count
+    FROM public.organization_members
+    GROUP BY org_id
+) m ON m.org_id = o.id;
+
+CREATE OR REPLACE VIEW public.admin_user_stats AS
+SELECT u.*, COALESCE(m.org_count, 0) AS org_count
+FROM public.users u
+LEFT JOIN (
+    SELECT user_id, COUNT(*) AS org_count
+    FROM public.organization_members
+    GROUP BY user_id
+) m ON m.user_id = u.id;
+
+-- Views run with their owner's privileges, so only the service role may read them
+REVOKE ALL ON public.admin_organization_stats FROM anon, authenticated;
+REVOKE ALL ON public.admin_user_stats FROM anon, authenticated;
+
+-- Platform metrics: running totals kept by triggers so dashboards never count rows.
+-- org_id is the all-zero UUID for platform-wide totals. Each counter is split
+-- over 8 shard rows, picked per connection, so concurrent writes do not queue
+-- on one hot row; readers sum the shards.
+CREATE TABLE IF NOT EXISTS public.platform_metrics (
+    metric TEXT NOT NULL,
+    org_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    shard SMALLINT NOT NULL DEFAULT 0,
+    total BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (metric, org_id, shard)
+);
+
+-- Daily created/deleted buckets per metric for growth charts; days are UTC dates
+CREATE TABLE IF NOT EXISTS public.platform_metrics_daily (
+    metric TEXT NOT NULL,
+    day DATE NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    created BIGINT NOT NULL DEFAULT 0,
+    deleted BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, day, shard)
+);
+
+ALTER TABLE public.platform_metrics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.platform_metrics_daily ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Super admins can view platform metrics" ON public.platform_metrics
+    FOR SELECT USING (public.is_super_admin());
+
+CREATE POLICY "Super admins can view platform metrics history" ON public.platform_metrics_daily
+    FOR SELECT USING (public.is_super_admin());
+
+CREATE OR REPLACE FUNCTION public.bump_platform_metrics()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INT := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+    row_shard SMALLINT := pg_backend_pid() % 8;
+    row_org UUID;
+BEGIN
+    INSERT INTO public.platform_metrics (metric, shard, total) VALUES (TG_TABLE_NAME, row_shard, delta)
+    ON CONFLICT (metric, org_id, shard) DO UPDATE
+        SET total = platform_metrics.total + delta, updated_at = NOW();
+
+    -- Per-org totals for tables scoped to an organization
+    IF TG_TABLE_NAME IN ('records', 'organization_members', 'agents') THEN
+        row_org := CASE WHEN TG_OP = 'INSERT' THEN NEW.org_id ELSE OLD.org_id END;
+        INSERT INTO public.platform_metrics (metric, org_id, shard, total) VALUES (TG_TABLE_NAME, row_org, row_shard, delta)
+        ON CONFLICT (metric, org_id, shard) DO UPDATE
+            SET total = platform_metrics.total + delta, updated_at = NOW();
+    END IF;
+
+    INSERT INTO public.platform_metrics_daily (metric, day, shard, created, deleted)
+    VALUES (TG_TABLE_NAME, (NOW() AT TIME ZONE 'UTC')::DATE, row_shard, GREATEST(delta, 0), GREATEST(-delta, 0))
+    ON CONFLICT (metric, day, shard) DO UPDATE
+        SET created = platform_metrics_daily.created + EXCLUDED.created,
+            deleted = platform_metrics_daily.deleted + EXCLUDED.deleted;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER platform_metrics_users AFTER INSERT OR DELETE ON public.users
+    FOR EACH ROW EXECUTE FUNCTION public.bump_platform_metrics();
+
+CREATE TRIGGER platform_metrics_organizations AFTER INSERT OR DELETE ON public.organizations
+    FOR EACH ROW EXECUTE FUNCTION public.bump_platform_metrics();
+
+CREATE TRIGGER platform_metrics_records AFTER INSERT OR DELETE ON public.records
+    FOR EACH ROW EXECUTE FUNCTION public.bump_platform_metrics();
+
+CREATE TRIGGER platform_metrics_organization_members AFTER INSERT OR DELETE ON public.organization_members
+    FOR EACH ROW EXECUTE FUNCTION public.bump_platform_metrics();
+
+CREATE TRIGGER platform_metrics_agents AFTER INSERT OR DELETE ON public.agents
+    FOR EACH ROW EXECUTE FUNCTION public.bump_platform_metrics();
+
+-- Recompute totals from the source tables: run once after creating the triggers,
+-- and periodically (e.g. nightly with pg_cron) to correct any drift
+CREATE OR REPLACE FUNCTION public.refresh_platform_metrics()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM public.platform_metrics;
+
+    INSERT INTO public.platform_metrics (metric, total)
+    SELECT 'users', COUNT(*) FROM public.users
+    UNION ALL SELECT 'organizations', COUNT(*) FROM public.organizations
+    UNION ALL SELECT 'records', COUNT(*) FROM public.records
+    UNION ALL SELECT 'organization_members', COUNT(*) FROM public.organization_members
+    UNION ALL SELECT 'agents', COUNT(*) FROM public.agents;
+
+    INSERT INTO public.platform_metrics (metric, org_id, total)
+    SELECT 'records', org_id, COUNT(*) FROM public.records GROUP BY org_id
+    UNION ALL SELECT 'organization_members', org_id, COUNT(*) FROM public.organization_members GROUP BY org_id
+    UNION ALL SELECT 'agents', org_id, COUNT(*) FROM public.agents GROUP BY org_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Maintenance only: not callable through the API by anonymous or signed-in users
+REVOKE EXECUTE ON FUNCTION public.refresh_platform_metrics() FROM PUBLIC, anon, authenticated;
+
+SELECT public.refresh_platform_metrics();
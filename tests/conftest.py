@@ -0,0 +1,68 @@
+import pytest
+from agentsdr.core import cache
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST query against in-memory rows"""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.row_limit = None
+
+    def select(self, *columns, count=None):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) >= value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def execute(self):
+        self.db.queries.append(self.table)
+        rows = [row for row in self.db.tables.get(self.table, []) if all(f(row) for f in self.filters)]
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        return FakeResponse(rows, count=len(rows))
+
+
+class FakeSupabase:
+    """Minimal Supabase client that records which tables were queried"""
+
+    def __init__(self, tables=None):
+        self.tables = tables or {}
+        self.queries = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def fake_supabase():
+    return FakeSupabase
+
+
+@pytest.fixture(autouse=True)
+def reset_named_caches():
+    """Named caches are process-wide; start every test with empty ones"""
+    cache._named_caches.clear()
+    yield
+    cache._named_caches.clear()
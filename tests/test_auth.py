@@ -46,3 +46,17 @@ def test_logout_redirects_to_landing(client):
     response = client.get('/auth/logout', follow_redirects=True)
     assert response.status_code == 200
     assert b'AgentSDR' in response.data
+
+def test_user_loader_is_cached_until_invalidated(app, monkeypatch, fake_supabase):
+    """The session loader reads users from the cache until the row is invalidated"""
+    from agentsdr.auth import models
+    db = fake_supabase({'users': [{'id': 'user-1', 'email': 'a@example.com', 'display_name': 'A', 'is_super_admin': False}]})
+    monkeypatch.setattr(models, 'get_service_supabase', lambda: db)
+
+    with app.app_context():
+        assert User.get_cached('user-1').email == 'a@example.com'
+        db.tables['users'][0]['is_super_admin'] = True
+        assert User.get_cached('user-1').is_super_admin is False
+        User.invalidate_cache('user-1')
+        assert User.get_cached('user-1').is_super_admin is True
+    assert db.queries == ['users', 'users']
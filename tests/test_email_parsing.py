@@ -0,0 +1,138 @@
+import base64
+import pytest
+from agentsdr.services.email_parsing import (
+    DEFAULT_MAX_CHARS, EmailCleaner, HTML_EXTRACTORS, decode_part, extractor_available, get_email_cleaner,
+    get_html_extractor, html_to_text, iter_text_parts, select_body_part
+)
+
+
+def test_clean_cuts_at_first_signature_marker():
+    """Everything from the earliest signature or footer marker is dropped"""
+    body = "Hi team,\n\n\n\nThe report is attached.\nBest regards,\nAnn\n--\nAnn Lee\n[Footer] unsubscribe"
+    assert EmailCleaner().clean(body) == "Hi team,\n\nThe report is attached."
+
+
+def test_clean_keeps_thanks_without_contact_details():
+    """A closing "Thanks" is only treated as a signature when contact details follow"""
+    assert EmailCleaner().clean("Can you review?\nThanks for the help") == "Can you review?\nThanks for the help"
+    assert EmailCleaner().clean("Can you review?\nThanks,\nBob\nbob@example.com") == "Can you review?"
+
+
+def test_clean_truncates_long_bodies():
+    cleaned = EmailCleaner(max_chars=50).clean("word " * 10000)
+    assert cleaned == ("word " * 10)[:50] + "..."
+
+
+def test_get_email_cleaner_uses_agent_config():
+    """Agent configs can add signature patterns or disable signature stripping"""
+    cleaner = get_email_cleaner({'extra_signature_patterns': [r'\nconfidentiality notice']})
+    assert cleaner.clean("Status update\nConfidentiality notice: do not forward") == "Status update"
+    assert get_email_cleaner({'strip_signatures': False}).clean("Hi\nSent from my phone") == "Hi\nSent from my phone"
+    assert get_email_cleaner() is get_email_cleaner({})
+
+
+def test_get_email_cleaner_ignores_invalid_options():
+    """Bad values fall back to defaults; unusable patterns are dropped without losing the valid ones"""
+    cleaner = get_email_cleaner({
+        'max_chars': 'lots',
+        'extra_signature_patterns': ['(unclosed', r'(a+)+$', 'x' * 500, r'\ndisclaimer'],
+    })
+    assert cleaner.max_chars == DEFAULT_MAX_CHARS
+    assert len(cleaner.extra_signatures) == 1
+    assert cleaner.clean("Update\nDisclaimer: legal text") == "Update"
+    assert get_email_cleaner({'max_chars': -5}).max_chars == DEFAULT_MAX_CHARS
+    assert get_email_cleaner({'extra_signature_patterns': r'\nfooter'}).extra_signatures == []
+
+
+NEWSLETTER = (
+    "<html><head><title>Weekly</title><style>p { color: red; }</style></head>"
+    "<body><h1>Top stories</h1><p>Launch &amp; pricing</p><script>track()</script>"
+    "<table><tr><td>Q3</td><td>report</td></tr></table></body></html>"
+)
+
+
+@pytest.mark.parametrize('backend', list(HTML_EXTRACTORS))
+def test_html_to_text_backends_skip_scripts_and_styles(backend):
+    if not extractor_available(backend):
+        pytest.skip(f"{backend} is not installed")
+    text = html_to_text(NEWSLETTER, backend=backend)
+    assert text == '\nTop stories\n\nLaunch & pricing\n\n\n\nQ3\n\nreport\n\n\n'
+
+
+@pytest.mark.parametrize('backend', list(HTML_EXTRACTORS))
+def test_html_to_text_backends_keep_inline_markup_on_one_line(backend):
+    """Only block elements start a new line; links and bold spans stay inside the sentence"""
+    if not extractor_available(backend):
+        pytest.skip(f"{backend} is not installed")
+    html = '<p>Hello <b>world</b>, see <a href="#">the <i>report</i></a>.</p><div>Next</div>'
+    assert html_to_text(html, backend=backend) == '\nHello world, see the report.\n\nNext\n'
+
+
+@pytest.mark.parametrize('backend', list(HTML_EXTRACTORS))
+def test_html_to_text_backends_handle_unusual_documents(backend):
+    """XHTML with an encoding declaration and comment-only documents do not fail"""
+    if not extractor_available(backend):
+        pytest.skip(f"{backend} is not installed")
+    xhtml = '<?xml version="1.0" encoding="utf-8"?><html><body><p>Weekly digest</p></body></html>'
+    assert html_to_text(xhtml, backend=backend).strip() == 'Weekly digest'
+    assert html_to_text('<!-- nothing to see -->', backend=backend).strip() == ''
+
+
+def test_html_to_text_falls_back_to_stream_when_a_backend_fails(monkeypatch):
+    def broken(html, limit):
+        raise ValueError('cannot parse')
+
+    monkeypatch.setitem(HTML_EXTRACTORS, 'broken', (None, broken))
+    assert html_to_text('<p>Hello <b>there</b></p>', backend='broken').split() == ['Hello', 'there']
+
+
+def test_html_to_text_stops_at_limit():
+    """The streaming extractor stops parsing once enough text has been collected"""
+    html = "<p>" + "lorem ipsum " * 50000 + "</p><p>never reached</p>"
+    text = html_to_text(html, limit=100, backend='stream')
+    assert len(text) == 100
+    assert 'never reached' not in text
+
+
+def test_get_html_extractor_falls_back_to_available_backend():
+    assert get_html_extractor('no-such-backend') in HTML_EXTRACTORS
+    assert get_html_extractor('stream') == 'stream'
+
+
+def text_part(mime_type, text, charset='utf-8', **extra):
+    data = base64.urlsafe_b64encode(text.encode(charset)).decode('ascii')
+    part = {
+        'mimeType': mime_type,
+        'headers': [{'name': 'Content-Type', 'value': f'{mime_type}; charset="{charset}"'}],
+        'body': {'size': len(text), 'data': data}
+    }
+    part.update(extra)
+    return part
+
+
+def test_select_body_part_walks_nested_multiparts():
+    """text/plain inside multipart/alternative inside multipart/mixed is found; attachments are ignored"""
+    plain = text_part('text/plain', 'Hello from the body')
+    payload = {
+        'mimeType': 'multipart/mixed',
+        'parts': [
+            text_part('text/plain', 'attached notes', filename='notes.txt'),
+            {'mimeType': 'multipart/alternative', 'parts': [text_part('text/html', '<p>Hello</p>'), plain]},
+            {'mimeType': 'application/pdf', 'filename': 'deck.pdf', 'body': {'attachmentId': 'att-1', 'size': 10}}
+        ]
+    }
+    assert select_body_part(payload) is plain
+    assert [part['mimeType'] for part in iter_text_parts(payload)] == ['text/html', 'text/plain']
+
+
+def test_select_body_part_falls_back_to_html():
+    html = text_part('text/html', '<p>Only HTML</p>')
+    payload = {'mimeType': 'multipart/alternative', 'parts': [text_part('text/plain', ''), html]}
+    assert select_body_part(payload) is html
+
+
+def test_decode_part_honors_charset():
+    assert decode_part(text_part('text/plain', 'Café crème', charset='iso-8859-1')) == 'Café crème'
+    unknown = text_part('text/plain', 'plain ascii')
+    unknown['headers'] = [{'name': 'Content-Type', 'value': 'text/plain; charset=x-unknown'}]
+    assert decode_part(unknown) == 'plain ascii'
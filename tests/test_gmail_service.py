@@ -0,0 +1,318 @@
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+from agentsdr import create_app
+from agentsdr.services import gmail_service as gmail_module
+from agentsdr.services.gmail_service import GmailService, fetch_emails_for_criteria
+
+
+class FakeGetRequest:
+    def __init__(self, message_id, message_format, metadata_headers=None):
+        self.message_id = message_id
+        self.message_format = message_format
+        self.metadata_headers = metadata_headers
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append([request_id for request_id, _ in self.requests])
+        for request_id, request in self.requests:
+            remaining = self.service.failures.get(request_id, 0)
+            if remaining:
+                self.service.failures[request_id] = remaining - 1
+                self.callback(request_id, None, Exception(f"boom {request_id}"))
+            else:
+                self.callback(request_id, self.service.message(request), None)
+
+
+class FakeGmail:
+    """Minimal stand-in for the googleapiclient Gmail resource"""
+
+    def __init__(self, failures=None, dates=None):
+        self.failures = dict(failures or {})
+        self.dates = dict(dates or {})  # Message id -> internalDate in seconds, listed newest first
+        self.batches = []
+        self.requests = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format, metadataHeaders=None):
+        self.requests.append((id, format, metadataHeaders))
+        return FakeGetRequest(id, format, metadataHeaders)
+
+    def list(self, userId, q, maxResults):
+        messages = [{'id': message_id} for message_id in list(self.dates)[:maxResults]]
+        return type('Request', (), {'execute': lambda _: {'messages': messages}})()
+
+    def message(self, request):
+        message = {'id': request.message_id, 'format': request.message_format,
+                   'internalDate': str(self.dates.get(request.message_id, 0) * 1000)}
+        if request.message_format == 'full':
+            date = datetime.fromtimestamp(self.dates.get(request.message_id, 0), timezone.utc)
+            message['payload'] = {
+                'mimeType': 'text/plain',
+                'headers': [{'name': 'Date', 'value': date.strftime('%a, %d %b %Y %H:%M:%S +0000')}],
+                'body': {}
+            }
+        return message
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr('agentsdr.services.gmail_service.time.sleep', lambda seconds: None)
+    app = create_app('testing')
+    app.config['GMAIL_BATCH_SIZE'] = 2
+    return app
+
+
+def test_fetch_messages_batches_requests(app):
+    """Messages are fetched in batches of GMAIL_BATCH_SIZE"""
+    service = FakeGmail()
+    with app.app_context():
+        fetched, failures = GmailService().fetch_messages(service, ['a', 'b', 'c'])
+    assert set(fetched) == {'a', 'b', 'c'}
+    assert failures == {}
+    assert service.batches == [['a', 'b'], ['c']]
+
+
+def test_fetch_messages_retries_failed_messages(app):
+    """Only failed messages are retried, and persistent failures are reported"""
+    service = FakeGmail(failures={'b': 1, 'c': 5})
+    with app.app_context():
+        fetched, failures = GmailService().fetch_messages(service, ['a', 'b', 'c'])
+    assert set(fetched) == {'a', 'b'}
+    assert list(failures) == ['c']
+    assert service.batches == [['a', 'b'], ['c'], ['b', 'c'], ['c']]
+
+
+def make_email(message_id, sender, subject):
+    return {'id': message_id, 'sender': sender, 'subject': subject, 'date': '2024-01-01 09:00', 'body': 'Hello'}
+
+
+def test_summarize_with_openai_keeps_group_order(app, monkeypatch):
+    """Concurrent summaries come back in group order, with fallbacks in place"""
+    import threading
+    last_done = threading.Event()
+
+    def fake_single(self, email, fallback_on_error=True):
+        if email['id'] == 'a':
+            # Finish after the last group to force out-of-order completion
+            last_done.wait(1)
+        if email['id'] == 'b':
+            raise RuntimeError('model unavailable')
+        if email['id'] == 'c':
+            last_done.set()
+        return f"summary {email['id']}"
+
+    monkeypatch.setattr(GmailService, 'summarize_single_email', fake_single)
+    emails = [make_email('a', 'Ann', 'One'), make_email('b', 'Bob', 'Two'), make_email('c', 'Cat', 'Three')]
+    with app.app_context():
+        summaries = GmailService().summarize_with_openai(emails)
+    assert [s['id'] for s in summaries] == ['a', 'b', 'c']
+    assert summaries[0]['summary'] == 'summary a'
+    assert summaries[1]['summary'] == 'Email from Bob regarding Two'
+
+
+def test_summarize_with_openai_reuses_cached_summaries(app, monkeypatch):
+    """A second run for the same agent only summarizes new emails"""
+    calls = []
+
+    def fake_single(self, email, fallback_on_error=True):
+        calls.append(email['id'])
+        return f"summary {email['id']}"
+
+    monkeypatch.setattr(GmailService, 'summarize_single_email', fake_single)
+    app.config['SUMMARY_CACHE_BACKEND'] = 'memory'
+    first = [make_email('a', 'Ann', 'One')]
+    second = [make_email('a', 'Ann', 'One'), make_email('b', 'Bob', 'Two')]
+    with app.app_context():
+        GmailService().summarize_with_openai(first, agent_id='agent-cache-test')
+        summaries = GmailService().summarize_with_openai(second, agent_id='agent-cache-test')
+    assert calls == ['a', 'b']
+    assert [s['summary'] for s in summaries] == ['summary a', 'summary b']
+
+
+class FakeHistory:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def users(self):
+        return self
+
+    def history(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        page = self.pages[len(self.calls) - 1]
+        return type('Request', (), {'execute': lambda _: page})()
+
+
+def test_list_history_collects_new_inbox_messages(app):
+    """History pages are followed and only inbox additions are collected"""
+    service = FakeHistory([
+        {
+            'history': [
+                {'messagesAdded': [{'message': {'id': 'm1'}}]},
+                {'labelsAdded': [{'message': {'id': 'm2'}, 'labelIds': ['INBOX']}]},
+                {'labelsAdded': [{'message': {'id': 'm3'}, 'labelIds': ['STARRED']}]},
+            ],
+            'historyId': '150',
+            'nextPageToken': 'next'
+        },
+        {'history': [{'messagesAdded': [{'message': {'id': 'm1'}}, {'message': {'id': 'm4'}}]}], 'historyId': '160'},
+    ])
+    with app.app_context():
+        message_ids, latest = GmailService().list_history(service, '100')
+    assert message_ids == ['m1', 'm2', 'm4']
+    assert latest == '160'
+    assert service.calls[1]['pageToken'] == 'next'
+
+
+def test_iter_summaries_yields_positions_as_groups_finish(app, monkeypatch):
+    """Streaming yields every group once with its original position"""
+    monkeypatch.setattr(GmailService, 'summarize_single_email',
+                        lambda self, email, fallback_on_error=True: f"summary {email['id']}")
+    emails = [make_email('a', 'Ann', 'One'), make_email('b', 'Bob', 'Two'), make_email('c', 'Cat', 'Three')]
+    with app.app_context():
+        results = list(GmailService().iter_summaries(emails))
+    assert sorted((position, summary['id']) for position, summary, _ in results) == [(0, 'a'), (1, 'b'), (2, 'c')]
+    assert {total for _, _, total in results} == {3}
+
+
+@pytest.fixture
+def token_exchanges(monkeypatch):
+    """Count token refreshes and service builds against an empty credentials cache"""
+    calls = {'refresh': 0, 'build': 0}
+
+    def fake_refresh(credentials, request):
+        calls['refresh'] += 1
+        credentials.token = f"access-{calls['refresh']}"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    def fake_build(*args, **kwargs):
+        calls['build'] += 1
+        return FakeGmail()
+
+    monkeypatch.setattr(Credentials, 'refresh', fake_refresh)
+    monkeypatch.setattr(gmail_module, 'build', fake_build)
+    monkeypatch.setattr(gmail_module, '_credentials_cache', None)
+    monkeypatch.setattr(gmail_module, '_thread_services', threading.local())
+    return calls
+
+
+def test_build_gmail_service_reuses_credentials_and_service(app, token_exchanges):
+    """Repeated builds for one refresh token skip the token exchange and discovery"""
+    with app.app_context():
+        first = GmailService().build_gmail_service('refresh-token')
+        second = GmailService().build_gmail_service('refresh-token')
+        assert GmailService().get_access_token('refresh-token') == 'access-1'
+        GmailService().build_gmail_service('other-token')
+    assert first is second
+    assert token_exchanges == {'refresh': 2, 'build': 2}
+
+
+def test_expired_credentials_are_refreshed(app, token_exchanges):
+    """A cached token close to expiry is exchanged for a new one"""
+    with app.app_context():
+        credentials = GmailService().get_credentials('refresh-token')
+        credentials.expiry = datetime.utcnow() + timedelta(seconds=10)
+        assert GmailService().get_access_token('refresh-token') == 'access-2'
+
+
+def test_thread_services_use_their_own_credentials(app, token_exchanges):
+    """A thread's service never shares the credentials object, but follows the shared token"""
+    with app.app_context():
+        shared = GmailService().get_credentials('refresh-token')
+        GmailService().build_gmail_service('refresh-token')
+        key = gmail_module.gmail_cache_key('refresh-token')
+        _, thread_credentials, _ = gmail_module._get_thread_services().get(key)
+        assert thread_credentials is not shared
+        assert thread_credentials.token == 'access-1'
+
+        shared.expiry = datetime.utcnow() + timedelta(seconds=10)
+        GmailService().build_gmail_service('refresh-token')
+    assert thread_credentials.token == shared.token == 'access-2'
+    assert token_exchanges == {'refresh': 2, 'build': 1}
+
+
+def test_auth_errors_evict_cached_credentials(app, token_exchanges, monkeypatch):
+    """A rejected refresh token is dropped so the next call starts from scratch"""
+    def revoked(self, refresh_token, criteria_type, count, service=None):
+        raise RefreshError('invalid_grant')
+
+    monkeypatch.setattr(GmailService, 'fetch_emails', revoked)
+    with app.app_context():
+        service = GmailService()
+        service.build_gmail_service('refresh-token')
+        with pytest.raises(RefreshError):
+            fetch_emails_for_criteria(service, 'refresh-token', 'latest_n', 5)
+        service.build_gmail_service('refresh-token')
+    assert token_exchanges == {'refresh': 2, 'build': 2}
+
+
+def test_fetch_emails_selects_oldest_from_metadata_first(app):
+    """oldest_n sorts all candidates by metadata and downloads full bodies only for the survivors"""
+    dates = {f"m{day}": 1700000000 + day * 86400 for day in range(6, 0, -1)}
+    service = FakeGmail(dates=dates)
+    with app.app_context():
+        emails = GmailService().fetch_emails('refresh-token', 'oldest_n', 2, service=service)
+
+    assert [email['id'] for email in emails] == ['m1', 'm2']
+    metadata = [request for request in service.requests if request[1] == 'metadata']
+    full = [request for request in service.requests if request[1] == 'full']
+    assert len(metadata) == 6
+    assert all(headers == ['From', 'Subject', 'Date'] for _, _, headers in metadata)
+    assert sorted(message_id for message_id, _, _ in full) == ['m1', 'm2']
+
+
+def test_fetch_emails_skips_metadata_phase_when_nothing_to_discard(app):
+    service = FakeGmail(dates={'m2': 1700086400, 'm1': 1700000000})
+    with app.app_context():
+        emails = GmailService().fetch_emails('refresh-token', 'latest_n', 2, service=service)
+    assert [email['id'] for email in emails] == ['m2', 'm1']
+    assert {request[1] for request in service.requests} == {'full'}
+
+
+def test_list_history_limit_resumes_after_last_processed_record(app):
+    """Messages beyond the limit are left for the next sync rather than skipped"""
+    service = FakeHistory([
+        {
+            'history': [
+                {'id': '101', 'messagesAdded': [{'message': {'id': 'm1'}}, {'message': {'id': 'm2'}}]},
+                {'id': '102', 'messagesAdded': [{'message': {'id': 'm3'}}]},
+                {'id': '103', 'messagesAdded': [{'message': {'id': 'm4'}}]},
+            ],
+            'historyId': '110',
+            'nextPageToken': 'next'
+        },
+        {'history': [{'id': '104', 'messagesAdded': [{'message': {'id': 'm5'}}]}], 'historyId': '110'},
+    ])
+    with app.app_context():
+        message_ids, resume_from = GmailService().list_history(service, '100', limit=4)
+    assert message_ids == ['m1', 'm2', 'm3', 'm4']
+    assert resume_from == '103'
+
+    service.calls.clear()
+    with app.app_context():
+        message_ids, resume_from = GmailService().list_history(service, '100', limit=2)
+    assert message_ids == ['m1', 'm2']
+    assert resume_from == '101'
@@ -0,0 +1,39 @@
+import pytest
+from agentsdr import create_app
+from agentsdr.core import http
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(http, '_transport', None)
+    monkeypatch.setattr(http, '_session', None)
+    app = create_app('testing')
+    app.config.update(HTTP_POOL_CONNECTIONS=7, HTTP_POOL_KEEPALIVE=3)
+    return app
+
+
+def test_shared_pools_use_config_and_report_stats(app):
+    """Pools are created once from config and show up in the utilization stats"""
+    with app.app_context():
+        assert http.http_pool_stats() == {}
+        transport = http.get_http_transport()
+        session = http.get_requests_session()
+        assert http.get_http_transport() is transport
+        assert http.get_requests_session() is session
+
+        stats = http.http_pool_stats()
+    assert stats['httpx']['max_connections'] == 7
+    assert stats['httpx']['max_keepalive_connections'] == 3
+    assert stats['httpx']['connections'] == 0
+    assert stats['requests']['hosts'] == 0
+
+
+def test_pool_stats_tolerate_missing_private_attributes(app, monkeypatch):
+    """Library internals that move between versions are reported as None instead of raising"""
+    with app.app_context():
+        http.get_requests_session()
+        monkeypatch.setattr(http, '_transport', object())
+        stats = http.http_pool_stats()
+    assert stats['httpx'] == {'max_connections': None, 'max_keepalive_connections': None,
+                              'connections': None, 'idle': None, 'http2': None}
+    assert stats['requests']['hosts'] == 0
@@ -0,0 +1,75 @@
+import time
+import pytest
+from agentsdr import create_app
+from agentsdr.services.jobs import JobQueue, MemoryJobStore, SqliteJobStore, JOB_SUCCEEDED, JOB_FAILED
+
+
+@pytest.fixture
+def queue():
+    app = create_app('testing')
+    return JobQueue(app, MemoryJobStore(ttl=60))
+
+
+def wait_for(queue, job_id, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in (JOB_SUCCEEDED, JOB_FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+def test_job_result_and_progress(queue):
+    """Jobs run in the background and record their result"""
+    def work(progress, value):
+        progress('working', 1, 2)
+        return value * 2
+
+    job = queue.enqueue('test', work, 21, owner_id='user-1')
+    finished = wait_for(queue, job['id'])
+    assert finished['result'] == 42
+    assert finished['owner_id'] == 'user-1'
+
+
+def test_job_failure_is_recorded(queue):
+    """Exceptions mark the job failed with the error message"""
+    def work(progress):
+        raise RuntimeError('quota exceeded')
+
+    job = queue.enqueue('test', work)
+    finished = wait_for(queue, job['id'])
+    assert finished['status'] == JOB_FAILED
+    assert finished['error'] == 'quota exceeded'
+
+
+def test_job_events_are_published_in_order(queue):
+    """Events published by a job can be read back from any offset"""
+    def work(progress):
+        for i in range(3):
+            progress.publish('item', {'n': i})
+        return None
+
+    job = queue.enqueue('test', work)
+    wait_for(queue, job['id'])
+    assert [event['data']['n'] for event in queue.events(job['id'])] == [0, 1, 2]
+    assert queue.events(job['id'], 2) == [{'event': 'item', 'data': {'n': 2}}]
+
+
+def test_queues_sharing_a_sqlite_store_see_each_others_jobs(tmp_path):
+    """A job enqueued by one worker can be polled, and its events read, from another"""
+    path = str(tmp_path / 'jobs.sqlite3')
+    app = create_app('testing')
+    first = JobQueue(app, SqliteJobStore(path, ttl=60))
+    second = JobQueue(app, SqliteJobStore(path, ttl=60))
+
+    def work(progress, value):
+        progress.publish('item', {'n': value})
+        return value * 2
+
+    job = first.enqueue('test', work, 21, owner_id='user-1')
+    finished = wait_for(second, job['id'])
+    assert finished['result'] == 42
+    assert finished['owner_id'] == 'user-1'
+    assert second.events(job['id']) == [{'event': 'item', 'data': {'n': 21}}]
+    assert second.get('missing') is None
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from agentsdr.core import metrics
+
+
+def test_growth_series_fills_missing_days(monkeypatch, fake_supabase):
+    """Every metric gets one point per UTC day, oldest first, shards summed and zeros where nothing happened"""
+    today = datetime.utcnow().date()
+    db = fake_supabase({'platform_metrics_daily': [
+        {'metric': 'users', 'day': today.isoformat(), 'created': 3, 'deleted': 1},
+        {'metric': 'users', 'day': today.isoformat(), 'created': 1, 'deleted': 0},
+        {'metric': 'users', 'day': (today - timedelta(days=30)).isoformat(), 'created': 9, 'deleted': 0},
+    ]})
+    monkeypatch.setattr(metrics, 'get_service_supabase', lambda: db)
+
+    series = metrics.get_growth_series(['users', 'records'], days=3)
+
+    assert [p['day'] for p in series['users']] == [(today - timedelta(days=n)).isoformat() for n in (2, 1, 0)]
+    assert [p['created'] for p in series['users']] == [0, 0, 4]
+    assert series['users'][-1]['deleted'] == 1
+    assert all(p['created'] == 0 for p in series['records'])
+    assert db.queries == ['platform_metrics_daily']
+
+
+def test_metric_totals_sum_shards(monkeypatch, fake_supabase):
+    db = fake_supabase({'platform_metrics': [
+        {'metric': 'users', 'org_id': metrics.PLATFORM_SCOPE, 'total': 5},
+        {'metric': 'users', 'org_id': metrics.PLATFORM_SCOPE, 'total': 2},
+        {'metric': 'records', 'org_id': metrics.PLATFORM_SCOPE, 'total': 9},
+        {'metric': 'records', 'org_id': 'org-1', 'total': 4},
+    ]})
+    monkeypatch.setattr(metrics, 'get_service_supabase', lambda: db)
+
+    assert metrics.get_metric_totals() == {'users': 7, 'records': 9}
@@ -0,0 +1,70 @@
+import pytest
+from flask import Flask
+from postgrest import SyncPostgrestClient
+from werkzeug.exceptions import BadRequest
+from agentsdr.core.pagination import encode_cursor, decode_cursor, paginate, paginate_request
+
+ID_1 = '00000000-0000-4000-8000-000000000001'
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+def make_query(rows):
+    query = SyncPostgrestClient('http://localhost').table('records').select('*').eq('org_id', 'org-1')
+    query.execute = lambda: FakeResponse(rows)
+    return query
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({'created_at': '2024-01-01T00:00:00+00:00', 'id': ID_1})
+    assert decode_cursor(cursor) == ('2024-01-01T00:00:00+00:00', ID_1)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+@pytest.mark.parametrize('created_at,row_id', [
+    ('2024-01-08",id.gt."0', ID_1),
+    ('2024-01-08', '1"),id.gt.("0'),
+    ('yesterday', ID_1),
+    (None, ID_1),
+])
+def test_decode_cursor_rejects_values_that_are_not_timestamps_and_uuids(created_at, row_id):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor({'created_at': created_at, 'id': row_id}))
+
+
+def test_paginate_request_rejects_malformed_cursor_with_400():
+    app = Flask(__name__)
+    cursor = encode_cursor({'created_at': '2024-01-08")', 'id': ID_1})
+    with app.test_request_context(f'/?cursor={cursor}'):
+        with pytest.raises(BadRequest):
+            paginate_request(make_query([]))
+
+
+def test_paginate_fetches_one_extra_row_for_next_cursor():
+    rows = [{'id': f'00000000-0000-4000-8000-00000000000{i}', 'created_at': f'2024-01-0{9 - i}T00:00:00'}
+            for i in range(3)]
+    query = make_query(rows)
+
+    page = paginate(query, limit=2)
+
+    assert [row['id'][-1] for row in page.items] == ['0', '1']
+    assert page.is_first and page.has_next
+    assert decode_cursor(page.next_cursor) == ('2024-01-08T00:00:00', ID_1)
+    assert query.params['limit'] == '3'
+    assert query.params['order'] == 'created_at.desc,id.desc'
+
+
+def test_paginate_applies_keyset_filter_from_cursor():
+    cursor = encode_cursor({'created_at': '2024-01-08T00:00:00', 'id': ID_1})
+    query = make_query([{'id': '00000000-0000-4000-8000-000000000002', 'created_at': '2024-01-07T00:00:00'}])
+
+    page = paginate(query, cursor=cursor, limit=2)
+
+    assert query.params['or'] == (
+        f'(created_at.lt."2024-01-08T00:00:00",and(created_at.eq."2024-01-08T00:00:00",id.lt."{ID_1}"))'
+    )
+    assert not page.is_first and not page.has_next
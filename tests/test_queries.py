@@ -0,0 +1,66 @@
+import pytest
+from agentsdr import create_app
+from agentsdr.core import queries
+
+
+@pytest.fixture
+def app():
+    return create_app('testing')
+
+
+def test_members_with_users_uses_one_query(monkeypatch, fake_supabase):
+    """Members come back joined with their profiles from a single embedded select"""
+    db = fake_supabase({'organization_members': [
+        {'org_id': 'org-1', 'user_id': f'user-{i}', 'role': 'member', 'joined_at': '2024-01-01',
+         'users': {'email': f'user{i}@example.com', 'display_name': f'User {i}'}}
+        for i in range(3)
+    ] + [{'org_id': 'org-1', 'user_id': 'orphan', 'role': 'member', 'joined_at': '2024-01-01', 'users': None}]})
+    monkeypatch.setattr(queries, 'get_service_supabase', lambda: db)
+
+    members = queries.get_org_members_with_users('org-1')
+
+    assert [m['email'] for m in members] == ['user0@example.com', 'user1@example.com', 'user2@example.com']
+    assert members[0] == {'user_id': 'user-0', 'email': 'user0@example.com', 'display_name': 'User 0',
+                          'role': 'member', 'joined_at': '2024-01-01'}
+    assert db.queries == ['organization_members']
+
+
+def test_user_org_memberships_filters_by_role(monkeypatch, fake_supabase):
+    """Organizations and the caller's role come back from one embedded select"""
+    db = fake_supabase({'organization_members': [
+        {'user_id': 'user-1', 'role': 'admin', 'joined_at': '2024-01-01', 'organizations': {'id': 'org-1', 'name': 'Acme'}},
+        {'user_id': 'user-1', 'role': 'member', 'organizations': {'id': 'org-2', 'name': 'Globex'}},
+        {'user_id': 'user-2', 'role': 'admin', 'organizations': {'id': 'org-3', 'name': 'Initech'}},
+    ]})
+    monkeypatch.setattr(queries, 'get_service_supabase', lambda: db)
+
+    assert [m['org']['id'] for m in queries.get_user_org_memberships('user-1')] == ['org-1', 'org-2']
+    assert queries.get_user_org_memberships('user-1', role='admin') == [
+        {'org': {'id': 'org-1', 'name': 'Acme'}, 'role': 'admin', 'joined_at': '2024-01-01'}
+    ]
+    assert db.queries == ['organization_members', 'organization_members']
+
+
+def test_org_overview_is_one_cached_rpc(app, monkeypatch):
+    """The overview comes from one RPC call and is served from cache until invalidated"""
+    calls = []
+
+    class FakeRpc:
+        def __init__(self, name, params):
+            calls.append((name, params))
+
+        def execute(self):
+            return type('Response', (), {'data': {'members_count': 3, 'recent_records': []}})()
+
+    class FakeClient:
+        rpc = FakeRpc
+
+    monkeypatch.setattr(queries, 'get_service_supabase', lambda: FakeClient())
+
+    with app.app_context():
+        assert queries.get_org_overview('org-1')['members_count'] == 3
+        queries.get_org_overview('org-1')
+        assert len(calls) == 1
+        queries.invalidate_org_overview('org-1')
+        queries.get_org_overview('org-1')
+    assert calls == [('org_overview', {'p_org_id': 'org-1', 'p_recent_limit': 10})] * 2
@@ -0,0 +1,100 @@
+import pytest
+from werkzeug.exceptions import Forbidden
+from agentsdr import create_app
+from agentsdr.core import rbac, org_cache
+from agentsdr.core.cache import cache_stats
+from agentsdr.core.models import OrganizationMemberRole
+
+
+class FakeUser:
+    is_authenticated = True
+
+    def __init__(self, id, is_super_admin=False):
+        self.id = id
+        self.is_super_admin = is_super_admin
+
+
+@pytest.fixture
+def app():
+    return create_app('testing')
+
+
+@pytest.fixture
+def db(monkeypatch, fake_supabase):
+    db = fake_supabase({
+        'organizations': [{'id': 'org-1', 'slug': 'acme', 'name': 'Acme'}],
+        'organization_members': [
+            {'org_id': 'org-1', 'user_id': 'admin-1', 'role': 'admin'},
+            {'org_id': 'org-1', 'user_id': 'member-1', 'role': 'member'},
+        ],
+    })
+    monkeypatch.setattr(rbac, 'get_service_supabase', lambda: db)
+    monkeypatch.setattr(org_cache, 'get_service_supabase', lambda: db)
+    return db
+
+
+def test_org_member_view_reuses_resolved_org(app, db, monkeypatch):
+    """The decorator resolves org and role once and the view reads them from g"""
+    monkeypatch.setattr(rbac, 'current_user', FakeUser('member-1'))
+
+    @rbac.require_org_member('org_slug')
+    def view(org_slug):
+        return rbac.get_current_org(org_slug), rbac.get_current_org_role()
+
+    with app.test_request_context():
+        organization, role = view(org_slug='acme')
+    assert organization['id'] == 'org-1'
+    assert role == OrganizationMemberRole.MEMBER
+    assert db.queries == ['organizations', 'organization_members']
+
+
+def test_org_admin_rejects_members(app, db, monkeypatch):
+    """Members without the admin role get a 403"""
+    monkeypatch.setattr(rbac, 'current_user', FakeUser('member-1'))
+
+    @rbac.require_org_admin('org_slug')
+    def view(org_slug):
+        return 'ok'
+
+    with app.test_request_context():
+        with pytest.raises(Forbidden):
+            view(org_slug='acme')
+
+
+def test_org_lookup_is_cached_across_requests_until_invalidated(app, db, monkeypatch):
+    """Later requests reuse the cached org row; invalidate_org forces a reload"""
+    monkeypatch.setattr(rbac, 'current_user', FakeUser('member-1'))
+
+    @rbac.require_org_member('org_slug')
+    def view(org_slug):
+        return rbac.get_current_org(org_slug)
+
+    for _ in range(2):
+        with app.test_request_context():
+            view(org_slug='acme')
+    assert db.queries.count('organizations') == 1
+
+    with app.test_request_context():
+        assert org_cache.get_org_by_id('org-1')['slug'] == 'acme'
+        org_cache.invalidate_org({'id': 'org-1', 'slug': 'acme'})
+        view(org_slug='acme')
+        assert cache_stats()['organizations']['hits'] == 2
+    assert db.queries.count('organizations') == 2
+
+
+@pytest.mark.parametrize('view_name,kwargs', [
+    ('delete_agent', {'agent_id': 'agent-1'}),
+    ('revoke_invitation', {'invitation_id': 'invite-1'}),
+    ('test_gmail_connection', {'agent_id': 'agent-1'}),
+    ('summarize_emails', {'agent_id': 'agent-1'}),
+])
+def test_super_admin_unknown_org_is_not_found(app, db, monkeypatch, view_name, kwargs):
+    """Super admins skip membership checks, so org-scoped views must handle a missing org themselves"""
+    from agentsdr.orgs import routes
+    monkeypatch.setattr(rbac, 'current_user', FakeUser('root-1', is_super_admin=True))
+    monkeypatch.setattr(routes, 'get_service_supabase', lambda: db)
+    monkeypatch.setattr(routes, 'get_supabase', lambda: db)
+
+    with app.test_request_context(method='POST', json={'type': 'latest_n', 'count': 5}):
+        response = getattr(routes, view_name)(org_slug='no-such-org', **kwargs)
+    assert response[1] == 404
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+import pytest
+from flask import g
+from agentsdr import create_app
+from agentsdr.orgs import routes
+from agentsdr.services.jobs import JobQueue, MemoryJobStore, JOB_SUCCEEDED
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config['SUMMARY_STREAM_POLL_INTERVAL'] = 0.01
+    return app
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    queue = JobQueue(app, MemoryJobStore(ttl=60))
+    monkeypatch.setattr(routes, 'get_job_queue', lambda: queue)
+    return queue
+
+
+def read_stream(app, org_id, job_id, last_event_id=None):
+    headers = {'Last-Event-ID': str(last_event_id)} if last_event_id is not None else {}
+    with app.test_request_context(headers=headers):
+        g.organization = {'id': org_id}
+        response = routes.summary_job_events.__wrapped__(org_slug='acme', agent_id='agent-1', job_id=job_id)
+        if isinstance(response, tuple):
+            return response[1]
+        return ''.join(response.response)
+
+
+def read_events(app, org_id, job_id, last_event_id=None):
+    body = read_stream(app, org_id, job_id, last_event_id)
+    if isinstance(body, int):
+        return body
+    events = []
+    for block in body.strip().split('\n\n'):
+        if block.startswith(':'):
+            continue
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_events_relay_published_summaries_then_done(app, queue):
+    """The SSE endpoint only relays what the background job publishes"""
+    def work(progress):
+        progress.publish('summary', {'position': 1, 'total': 2, 'summary': {'subject': 'b'}})
+        progress.publish('summary', {'position': 0, 'total': 2, 'summary': {'subject': 'a'}})
+        return {'run_id': 'run-1', 'count': 2}
+
+    job = queue.enqueue('email_summary', work, org_id='org-1', agent_id='agent-1')
+    while queue.get(job['id'])['status'] != JOB_SUCCEEDED:
+        time.sleep(0.01)
+
+    events = read_events(app, 'org-1', job['id'])
+    assert [(event_id, name) for event_id, name, _ in events] == [('0', 'summary'), ('1', 'summary'), (None, 'done')]
+    assert events[-1][2]['run_id'] == 'run-1'
+
+    # A reconnecting client resumes after the last event it saw
+    assert [name for _, name, _ in read_events(app, 'org-1', job['id'], last_event_id=0)] == ['summary', 'done']
+
+
+def test_idle_stream_sends_keepalives_and_ends_at_timeout(app, queue):
+    """A stream for a job that never finishes is closed well before the job TTL"""
+    app.config['SUMMARY_STREAM_TIMEOUT'] = 0.05
+    release = threading.Event()
+    job = queue.enqueue('email_summary', lambda progress: release.wait(2),
+                        org_id='org-1', agent_id='agent-1')
+    try:
+        started = time.monotonic()
+        body = read_stream(app, 'org-1', job['id'])
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+    assert body.startswith(': keepalive\n\n')
+    assert 'event:' not in body
+
+
+def test_events_hidden_from_other_organizations(app, queue):
+    job = queue.enqueue('email_summary', lambda progress: {'run_id': 'run-1', 'count': 0},
+                        org_id='org-1', agent_id='agent-1')
+    assert read_events(app, 'org-2', job['id']) == 404
+
+
+def test_job_status_hidden_from_other_organizations(app, queue):
+    """A job id from another organization is not found through your own slug"""
+    job = queue.enqueue('email_summary', lambda progress: {'run_id': 'run-1', 'count': 0},
+                        org_id='org-1', agent_id='agent-1')
+    with app.test_request_context():
+        g.organization = {'id': 'org-2'}
+        response = routes.summary_job_status.__wrapped__(org_slug='acme', agent_id='agent-1', job_id=job['id'])
+    assert response[1] == 404
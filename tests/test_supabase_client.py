@@ -0,0 +1,66 @@
+import threading
+import httpx
+import pytest
+from flask import session
+from agentsdr import create_app
+from agentsdr.core.supabase_client import SupabaseManager
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config.update(SUPABASE_URL='https://example.supabase.co', SUPABASE_ANON_KEY='anon-key')
+    return app
+
+
+def test_concurrent_requests_never_share_tokens(app):
+    """Each request's queries carry its own user's token, even when interleaved"""
+    workers = 8
+    barrier = threading.Barrier(workers)
+    seen = []
+    seen_lock = threading.Lock()
+
+    def handler(request):
+        with seen_lock:
+            # PostgREST filters arrive as owner=eq.<i>
+            owner = request.url.params['owner'].split('.', 1)[1]
+            seen.append((owner, request.headers['Authorization']))
+        return httpx.Response(200, json=[])
+
+    manager = SupabaseManager()
+    manager._transport = httpx.MockTransport(handler)
+    errors = []
+
+    def run(i):
+        try:
+            with app.test_request_context():
+                session['supabase_token'] = f'token-{i}'
+                client = manager.get_client()
+                # Line every thread up so the handles are built and used concurrently
+                barrier.wait()
+                for _ in range(5):
+                    client.table('records').select('*').eq('owner', str(i)).execute()
+                    assert manager.get_client() is client
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(seen) == workers * 5
+    assert all(auth == f'Bearer token-{owner}' for owner, auth in seen)
+
+
+def test_client_follows_session_token_changes(app):
+    """Logging in mid-request switches to a handle bound to the new token"""
+    manager = SupabaseManager()
+    with app.test_request_context():
+        anonymous = manager.get_client()
+        assert anonymous.access_token is None
+        manager.set_session('token-1')
+        assert manager.get_client().access_token == 'token-1'
+        assert manager.get_client() is not anonymous